@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+from functools import partial
 
 # Set page config
 st.set_page_config(
@@ -23,13 +24,59 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-from utils.resume_data import ResumeBuilder
-from utils.ai_engine import AIEngine
+from utils.resume_data import GUEST_EMAIL, ResumeBuilder
+from utils.ai_engine import get_ai_engine
 from utils.builder_flow import render_builder
-from utils.pdf_generator import ResumeGenerator
+from utils.pdf_cache import get_pdf_cache
+from utils.render_pool import RenderError, get_render_pool
+from utils.html_preview import render_preview
+from utils.fit_engine import estimate_fit
+from utils.templates import DEFAULT_TEMPLATE, TEMPLATES, get_template
 from utils.auth import get_login_ui, verify_token
+from utils.db import init_db, log_login
 import time
 
+# While the database is down, probe it at most this often (shared by all sessions)
+DB_RETRY_SECONDS = 30
+
+@st.cache_resource(show_spinner=False)
+def setup_database():
+    # Create tables once per process rather than on every rerun; failures are not
+    # cached, so a later rerun tries again
+    init_db()
+    return True
+
+@st.cache_resource(show_spinner=False)
+def database_status():
+    return {"error": None, "failed_at": 0.0}
+
+def database_available():
+    """Set up the database if possible; the app keeps working without persistence if not."""
+    status = database_status()
+    if status["error"] and time.time() - status["failed_at"] < DB_RETRY_SECONDS:
+        return False
+    try:
+        setup_database()
+    except Exception as e:
+        print(f"DB Setup Error: {e}")
+        status.update(error=str(e), failed_at=time.time())
+        return False
+    status["error"] = None
+    return True
+
+def export_pdf(errors, resume_data, template, fit_pages):
+    """
+    Deferred download for the preview page. Streamlit only shows a generic failure
+    for exceptions raised here, so the message is also left in errors (a list in
+    the session's state) for the page to show on its next run.
+    """
+    try:
+        return get_pdf_cache().get_or_render(resume_data, template, get_render_pool().render, fit_pages=fit_pages)
+    except RenderError as e:
+        print(f"PDF Export Error: {e}")
+        errors.append(str(e))
+        raise
+
 def main():
     st.title("AI Resume Builder & Career Assistant")
     
@@ -38,11 +85,21 @@ def main():
         st.session_state.page = 'onboarding'
     
     # Initialize Core Classes
+    db_ready = database_available()
+    if not db_ready:
+        st.sidebar.warning(f"Database unavailable, your resume won't be saved ({database_status()['error']})")
     builder = ResumeBuilder()
+    if db_ready:
+        if 'email' in st.session_state:
+            # Saved resume is loaded on the first run after sign-in
+            builder.attach_user(st.session_state.email)
+        # Sections saved before the last st.rerun() are queued here; writes are debounced.
+        # While the database is down they stay dirty and are saved once it is back.
+        builder.save()
     
     # Initialize AI Engine (handle potential errors gracefully)
     try:
-        ai_engine = AIEngine()
+        ai_engine = get_ai_engine()
         st.sidebar.success("AI Engine: Online 🟢")
     except Exception as e:
         st.sidebar.error(f"AI Engine: Offline 🔴 ({str(e)})")
@@ -77,6 +134,7 @@ def main():
                 user_decoded = verify_token(token)
                 if user_decoded:
                     st.session_state.email = user_decoded.get('email')
+                    log_login(st.session_state.email)
                     st.session_state.page = 'role_selection'
                     # Clear query params to prevent re-auth loops
                     st.query_params.clear()
@@ -92,7 +150,8 @@ def main():
             st.markdown("---")
             st.caption("Or continue as guest (Data might not be saved properly)")
             if st.button("Continue as Guest"):
-                st.session_state.email = "guest@example.com"
+                st.session_state.email = GUEST_EMAIL
+                log_login(GUEST_EMAIL)
                 st.session_state.page = 'role_selection'
                 st.rerun()
     
@@ -100,6 +159,13 @@ def main():
     elif st.session_state.page == 'role_selection':
         st.header("Step 2: Define Your Goal")
         st.write("Select the role you are targeting to get customized recommendations.")
+
+        progress = builder.saved_progress()
+        if progress:
+            st.info(f"You have a saved resume for **{progress.get('user_role') or 'your role'}**.")
+            if st.button("Continue where you left off"):
+                builder.resume_progress()
+                st.rerun()
         
         roles = [
             "Software Engineer", 
@@ -112,10 +178,13 @@ def main():
             "Other"
         ]
         
-        selected_role = st.selectbox("Select Target Role:", roles)
+        # Preselect the saved role, if any
+        saved_role = builder.get_role()
+        role_index = roles.index(saved_role) if saved_role in roles else (len(roles) - 1 if saved_role else 0)
+        selected_role = st.selectbox("Select Target Role:", roles, index=role_index)
         
         if selected_role == "Other":
-            custom_role = st.text_input("Please specify your role:")
+            custom_role = st.text_input("Please specify your role:", "" if saved_role in roles else saved_role)
             if custom_role:
                 selected_role = custom_role
         
@@ -135,8 +204,9 @@ def main():
         st.header("Step 3: Choose a Template")
         st.write("Select a layout that fits your style.")
         
-        templates = ["Classic Professional", "Modern Clean", "Tech Minimalist"]
-        selected_template = st.radio("Available Templates:", templates)
+        templates = list(TEMPLATES)
+        current = get_template(st.session_state.get('selected_template')).name
+        selected_template = st.radio("Available Templates:", templates, index=templates.index(current))
         
         col1, col2 = st.columns(2)
         with col1:
@@ -153,29 +223,58 @@ def main():
 
     # --- PAGE: BUILDER (Placeholder) ---
     elif st.session_state.page == 'builder':
+        # Spawns and warms the render workers while the resume is still being written
+        get_render_pool()
         render_builder(builder, ai_engine)
+        if db_ready:
+            # AI results picked up during this run are queued now, not on the next rerun
+            builder.save()
         
     # --- PAGE: PREVIEW & EXPORT ---
     elif st.session_state.page == 'preview':
         st.header("Final Preview")
         st.success("Your resume is ready!")
         
-        # Generate PDF
         resume_data = builder.get_data()
-        pdf_gen = ResumeGenerator(resume_data)
-        pdf_bytes = pdf_gen.generate()
+        template = st.session_state.get('selected_template', DEFAULT_TEMPLATE)
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            st.subheader("Resume Content Preview")
-            st.json(resume_data) # Simple preview for now, or we could render HTML
+            st.subheader("Resume Preview")
+            fit_one_page = st.toggle("Fit to one page", key="fit_one_page",
+                                     help="Tightens spacing, then type size, then trims bullets in the PDF.")
+            if fit_one_page:
+                # Up to a dozen layout passes: run them in the render pool, not on the script thread
+                try:
+                    with st.spinner("Checking the one-page fit..."):
+                        fit = estimate_fit(resume_data, template, 1, run=get_render_pool().call)
+                except RenderError as e:
+                    print(f"Fit Estimate Error: {e}")
+                    fit = None
+                    st.warning(f"Couldn't check the one-page fit ({e})")
+                if fit is None:
+                    pass
+                elif not fit.fits:
+                    st.warning(f"Even at the smallest size this resume needs {fit.pages} pages. Consider shortening it.")
+                elif fit.max_bullets:
+                    bullets = "1 bullet" if fit.max_bullets == 1 else f"{fit.max_bullets} bullets"
+                    st.caption(f"Fits on one page at {fit.font_scale:.0%} type size, with up to {bullets} per entry.")
+                elif fit.font_scale < 1 or fit.spacing_scale < 1:
+                    st.caption(f"Fits on one page at {fit.font_scale:.0%} type size.")
+            # HTML preview from the same template spec; only changed sections are re-rendered
+            st.html(render_preview(resume_data, template))
             
         with col2:
             st.subheader("Actions")
+            export_errors = st.session_state.setdefault('export_errors', [])
+            while export_errors:
+                st.error(export_errors.pop(0))
+            # The PDF is only generated when the button is clicked (served from cache
+            # unless the resume or template changed, rendered in the worker pool otherwise)
             st.download_button(
                 label="📄 Download PDF",
-                data=pdf_bytes,
+                data=partial(export_pdf, export_errors, resume_data, template, 1 if fit_one_page else 0),
                 file_name=f"{st.session_state.get('email', 'resume').split('@')[0]}_resume.pdf",
                 mime="application/pdf"
             )
@@ -187,6 +286,7 @@ def main():
                 st.rerun()
             
             if st.button("Start Over"):
+                builder.discard_saved()
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
                 st.rerun()
@@ -0,0 +1,198 @@
+"""
+Render many resumes to PDF from the command line, in parallel across cores.
+
+Input is either a directory of *.json files (one resume each) or a JSON Lines
+file / stdin ("-") with one resume per line. Documents are read lazily and only
+a bounded number are in flight at once, so memory stays flat for any batch size:
+
+    python batch_export.py resumes/ --out-dir pdfs/
+    python batch_export.py career_fair.jsonl --zip career_fair.zip --report report.jsonl
+    cat resumes.jsonl | python batch_export.py - --zip out.zip --workers 8
+
+Each document is the resume data as stored by ResumeBuilder. Two optional keys
+are read and removed before rendering: "id" (output file name) and "template"
+(a name from utils.templates.TEMPLATES; documents naming any other template
+fail). Exits non-zero if any document failed.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.pdf_generator import render_resume, warm_up
+from utils.templates import DEFAULT_TEMPLATE, TEMPLATES
+
+
+def iter_documents(source):
+    """Yield (doc_id, data_or_error) lazily from a directory, a JSONL file or stdin."""
+    if source != "-" and os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if not name.endswith(".json"):
+                continue
+            doc_id = os.path.splitext(name)[0]
+            try:
+                with open(os.path.join(source, name), encoding="utf-8") as f:
+                    yield doc_id, json.load(f)
+            except (OSError, ValueError) as e:
+                yield doc_id, e
+        return
+
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for lineno, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            doc_id = f"resume_{lineno:05d}"
+            try:
+                yield doc_id, json.loads(line)
+            except ValueError as e:
+                yield doc_id, e
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _render_timed(data, template, path=None):
+    # With a path the worker streams the PDF straight to disk; only its size comes back
+    started = time.perf_counter()
+    result = render_resume(data, template, target=path)
+    return result, time.perf_counter() - started
+
+
+class Writer:
+    """Writes finished PDFs to a directory or a zip file, de-duplicating names."""
+
+    def __init__(self, out_dir=None, zip_path=None):
+        self.out_dir = out_dir
+        self.zip = None
+        self._names = set()
+        if zip_path:
+            # PDF streams are already deflated, so storing is as small and much faster
+            self.zip = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED)
+        elif out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+    def _unique_name(self, doc_id):
+        base = re.sub(r"[^\w.-]", "_", doc_id) or "resume"
+        name, n = f"{base}.pdf", 1
+        while name in self._names:
+            n += 1
+            name = f"{base}_{n}.pdf"
+        self._names.add(name)
+        return name
+
+    def reserve(self, doc_id):
+        """Pick the output name; returns (name, path), with path None when writing a zip."""
+        name = self._unique_name(doc_id)
+        return name, None if self.zip is not None else os.path.join(self.out_dir, name)
+
+    def write(self, name, pdf):
+        self.zip.writestr(name, pdf)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+def export(documents, writer, template=DEFAULT_TEMPLATE, workers=None, max_in_flight=None, report=None):
+    """Render every document, writing PDFs as they finish. Returns the summary dict."""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    started = time.perf_counter()
+    render_times, failures, total = [], 0, 0
+
+    def record(entry):
+        nonlocal failures
+        if not entry["ok"]:
+            failures += 1
+            print(f"FAILED {entry['id']}: {entry['error']}", file=sys.stderr)
+        if report is not None:
+            report.write(json.dumps(entry) + "\n")
+
+    def collect(done):
+        for future in done:
+            doc_id, doc_template, name, path = in_flight.pop(future)
+            try:
+                result, seconds = future.result()
+                if path is None:
+                    writer.write(name, result)
+                    size = len(result)
+                else:
+                    size = result
+                render_times.append(seconds)
+                record({"id": doc_id, "ok": True, "template": doc_template, "file": name,
+                        "seconds": round(seconds, 4), "bytes": size})
+            except Exception as e:
+                record({"id": doc_id, "ok": False, "template": doc_template, "error": str(e)})
+
+    in_flight = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as pool:
+        for doc_id, data in documents:
+            total += 1
+            if isinstance(data, Exception) or not isinstance(data, dict):
+                record({"id": doc_id, "ok": False, "error": f"invalid document: {data!r}"[:300]})
+                continue
+            doc_id = str(data.pop("id", doc_id))
+            doc_template = data.pop("template", template)
+            if doc_template not in TEMPLATES:
+                # get_template() would quietly fall back to the default
+                record({"id": doc_id, "ok": False, "template": doc_template,
+                        "error": f"unknown template {doc_template!r}"[:300]})
+                continue
+            name, path = writer.reserve(doc_id)
+            in_flight[pool.submit(_render_timed, data, doc_template, path)] = (doc_id, doc_template, name, path)
+            # Back-pressure: stop reading input until a render slot frees up
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    elapsed = time.perf_counter() - started
+    ordered = sorted(render_times)
+    return {
+        "documents": total,
+        "rendered": len(ordered),
+        "failed": failures,
+        "workers": workers,
+        "wall_seconds": round(elapsed, 3),
+        "docs_per_second": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "render_p50": round(ordered[len(ordered) // 2], 4) if ordered else None,
+        "render_p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4) if ordered else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory of *.json files, a .jsonl file, or - for JSONL on stdin")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out-dir", help="write one PDF per document into this directory")
+    target.add_argument("--zip", help="write all PDFs into this zip file")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, choices=list(TEMPLATES),
+                        help="template for documents without a 'template' key")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="render processes")
+    parser.add_argument("--max-in-flight", type=int, help="documents queued or rendering at once (default 2x workers)")
+    parser.add_argument("--report", help="write a per-document JSON Lines report to this file")
+    args = parser.parse_args(argv)
+
+    writer = Writer(out_dir=args.out_dir, zip_path=args.zip)
+    report = open(args.report, "w") if args.report else None
+    try:
+        summary = export(iter_documents(args.source), writer, template=args.template,
+                         workers=args.workers, max_in_flight=args.max_in_flight, report=report)
+    finally:
+        writer.close()
+        if report is not None:
+            report.close()
+
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
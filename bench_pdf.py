@@ -0,0 +1,151 @@
+"""
+Benchmark for PDF generation across resume sizes and templates.
+
+Builds a deterministic synthetic corpus (from a couple of entries up to
+hundreds, long descriptions, many skills, non-Latin text) and measures, per
+template and size: render time, peak Python memory (tracemalloc), output size
+and page count. Results are JSON so runs can be diffed:
+
+    python bench_pdf.py --repeat 5 --out bench_pdf.json
+    python bench_pdf.py --sizes small,large --templates "Modern Clean"
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from utils.benchmark import summarize
+from utils.fit_engine import fit_to_pages, measure_pages
+from utils.pdf_generator import RENDERER_VERSION, ResumeGenerator
+from utils.templates import TEMPLATES
+
+# name -> (experience entries, project entries, bullets per entry, words per bullet, skills)
+SIZES = {
+    "small": (2, 1, 3, 12, 8),
+    "medium": (5, 3, 4, 18, 20),
+    "large": (25, 15, 5, 25, 60),
+    "huge": (150, 100, 6, 30, 200),
+}
+
+WORDS = (
+    "designed built led scaled migrated automated reduced improved launched owned mentored "
+    "latency throughput pipeline platform service api dashboard cluster cost revenue customers "
+    "kubernetes python sql react aws terraform kafka spark observability reliability security "
+    "cross-functional stakeholders roadmap experiments onboarding incidents — “quoted” café Zürich"
+).split()
+
+
+def synthetic_resume(size, seed=0):
+    n_exp, n_proj, bullets, words, n_skills = SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+    def description():
+        return "\n".join(f"- {sentence(words)}" for _ in range(bullets))
+
+    return {
+        "contact_info": {"first_name": "Björn", "last_name": "Nakamura-Øster", "email": "bench@example.com",
+                         "phone": "+1 555 0100", "linkedin": "linkedin.com/in/bench", "location": "Zürich"},
+        "summary": " ".join(sentence(words) for _ in range(4)),
+        "skills": [f"{rng.choice(WORDS)}-{i}" for i in range(n_skills)],
+        "experience": [{"role": f"Engineer {i}", "company": f"Company {i}", "duration": "2019 – 2024",
+                        "description": description()} for i in range(n_exp)],
+        "projects": [{"title": f"Project {i}", "tech": "Python, SQL", "description": description()}
+                     for i in range(n_proj)],
+        "education": [{"degree": "B.Sc. Computer Science", "school": "ETH Zürich", "year": "2018", "grade": "5.5"}],
+        "certifications": [f"Certification {i}" for i in range(max(1, n_exp // 5))],
+    }
+
+
+def bench_render(data, template, repeat):
+    # First render pays for plan compilation, font parsing and cold caches
+    started = time.perf_counter()
+    pdf = ResumeGenerator(data, template).generate()
+    first = time.perf_counter() - started
+
+    # Warm renders reuse one generator, as render workers do
+    generator = ResumeGenerator(template=template)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pdf = generator.render(data)
+        times.append(time.perf_counter() - started)
+
+    # Separate pass for memory: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    ResumeGenerator(data, template).generate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "first_seconds": first,
+        "seconds": summarize(times),
+        "peak_memory_bytes": peak,
+        "output_bytes": len(pdf),
+        "pages": generator.pdf.page,
+    }
+
+
+def bench_fit(data, template):
+    started = time.perf_counter()
+    pages = measure_pages(data, template)
+    measure_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    fit = fit_to_pages(data, template, target_pages=max(1, pages - 1))
+    return {
+        "measure_seconds": measure_seconds,
+        "fit_seconds": time.perf_counter() - started,
+        "fit_passes": fit.passes,
+        "fit_fits": fit.fits,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma separated subset of: " + ", ".join(SIZES))
+    parser.add_argument("--templates", default=",".join(TEMPLATES), help="comma separated template names")
+    parser.add_argument("--repeat", type=int, default=5, help="timed renders per template and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-fit", action="store_true", help="skip fit engine measurements")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    templates = [t.strip() for t in args.templates.split(",") if t.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [t for t in templates if t not in TEMPLATES]
+    if unknown:
+        parser.error(f"unknown size/template: {', '.join(unknown)}")
+
+    results = {
+        "renderer_version": RENDERER_VERSION,
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "runs": [],
+    }
+    for size in sizes:
+        data = synthetic_resume(size, args.seed)
+        for template in templates:
+            run = {"size": size, "template": template,
+                   "input_bytes": len(json.dumps(data, ensure_ascii=False).encode("utf-8"))}
+            run.update(bench_render(data, template, args.repeat))
+            if not args.no_fit:
+                run.update(bench_fit(data, template))
+            results["runs"].append(run)
+            print(f"{size:>6} {template:<22} p50 {run['seconds']['p50'] * 1000:8.1f} ms  "
+                  f"peak {run['peak_memory_bytes'] / 1024:8.0f} KiB  {run['output_bytes'] / 1024:7.0f} KiB  "
+                  f"{run['pages']} pages", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
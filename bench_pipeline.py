@@ -0,0 +1,158 @@
+"""
+Offline latency/throughput benchmark for the AI pipeline.
+
+Runs against the local stub provider (no network, no API key), so numbers
+reflect our own overhead plus the simulated provider latency:
+
+    python bench_pipeline.py --sessions 20 --calls 10 --out bench_ai.json
+
+Stub behaviour is tuned with STUB_LATENCY_MS, STUB_LATENCY_SIGMA,
+STUB_ERROR_RATE and STUB_TOKENS_PER_SECOND (see utils/llm_providers.py).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Must be set before the engine reads its settings
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("AI_CACHE_BACKEND", "none")
+os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "100000")
+os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "100000000")
+
+from utils.ai_engine import AIEngine, AIEngineError
+from utils.benchmark import summarize
+
+
+def bench_engine(engine, sessions, calls):
+    """Simulated concurrent sessions, each making a mix of blocking and streaming calls."""
+    latencies, ttfts, errors = [], [], 0
+
+    def session(session_id):
+        nonlocal errors
+        for i in range(calls):
+            text = f"session {session_id} call {i} maintained data pipelines for reporting"
+            started = time.perf_counter()
+            try:
+                if i % 3 == 0:
+                    first = None
+                    for _ in engine.stream_chat("Experience", text, "Data Analyst"):
+                        first = first or time.perf_counter()
+                    ttfts.append(first - started)
+                elif i % 3 == 1:
+                    engine.optimize_bullet_point("Data Analyst", text)
+                else:
+                    engine.generate_summary("Data Analyst", "mid level", [text])
+            except AIEngineError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "calls_per_session": calls,
+        "wall_seconds": elapsed,
+        "throughput_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "latency": summarize(latencies),
+        "stream_ttft": summarize(ttfts),
+    }
+
+
+def bench_batch(engine, size, rounds):
+    durations, failures = [], 0
+    for r in range(rounds):
+        texts = [f"round {r} entry {i}: led migration of reporting stack" for i in range(size)]
+        started = time.perf_counter()
+        results = engine.optimize_many_sync("Software Engineer", texts)
+        durations.append(time.perf_counter() - started)
+        failures += sum(1 for result in results if not result.ok)
+    return {"batch_size": size, "rounds": rounds, "failures": failures, "duration": summarize(durations)}
+
+
+def bench_builder(runs):
+    """Drive render_builder end to end through Streamlit's AppTest harness."""
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    flows, reruns = [], []
+
+    def click(at, label):
+        button = next(b for b in at.button if b.label == label)
+        button.click()
+        started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - started)
+        # AI work runs as background jobs; keep polling like the browser would
+        registry = at.session_state["ai_jobs"] if "ai_jobs" in at.session_state else None
+        if registry is not None and registry.running():
+            while registry.running():
+                time.sleep(0.02)
+            at.run()
+
+    for run in range(runs):
+        started = time.perf_counter()
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.session_state["page"] = "builder"
+        at.session_state["email"] = f"bench{run}@example.com"
+        at.session_state["user_role"] = "Software Engineer"
+        at.run()
+        for i, value in enumerate(["Ada", "Lovelace", "555-0100"]):
+            at.text_input[i].input(value)
+        click(at, "Save & Continue")
+        at.text_area[0].input(f"run {run}: five years of Python and data engineering")
+        click(at, "Generate Professional Summary")
+        click(at, "Save Summary")
+        at.multiselect[0].select("Python")
+        click(at, "Save Skills")
+        for j in range(3):
+            at.text_input[0].input(f"Engineer {j}")
+            at.text_input[1].input(f"Company {run}-{j}")
+            at.text_area[0].input(f"built ingestion service {j}")
+            click(at, "Optimize & Add Position")
+        click(at, "Re-optimize All Positions")
+        at.chat_input[0].set_value("How should I phrase impact?")
+        rerun_started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - rerun_started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        flows.append(time.perf_counter() - started)
+    return {"runs": runs, "flow_seconds": summarize(flows), "rerun_seconds": summarize(reruns)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated sessions")
+    parser.add_argument("--calls", type=int, default=6, help="AI calls per session")
+    parser.add_argument("--batch-size", type=int, default=5, help="entries per optimize_many batch")
+    parser.add_argument("--batch-rounds", type=int, default=5)
+    parser.add_argument("--builder-runs", type=int, default=2, help="end-to-end render_builder flows (0 to skip)")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    engine = AIEngine()
+    results = {
+        "provider": engine.provider.name,
+        "engine": bench_engine(engine, args.sessions, args.calls),
+        "batch": bench_batch(engine, args.batch_size, args.batch_rounds),
+    }
+    if args.builder_runs:
+        results["builder"] = bench_builder(args.builder_runs)
+    results["routing"] = engine.routing_stats()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
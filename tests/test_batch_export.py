@@ -0,0 +1,78 @@
+import io
+import json
+import zipfile
+
+from batch_export import Writer, export, iter_documents
+from utils.pdf_generator import WARMUP_RESUME
+
+
+def _jsonl(tmp_path, documents):
+    path = tmp_path / "batch.jsonl"
+    path.write_text("\n".join(d if isinstance(d, str) else json.dumps(d) for d in documents) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+
+def _run(tmp_path, documents, **writer_args):
+    report = io.StringIO()
+    writer = Writer(**writer_args)
+    try:
+        summary = export(iter_documents(_jsonl(tmp_path, documents)), writer, workers=1, report=report)
+    finally:
+        writer.close()
+    entries = [json.loads(line) for line in report.getvalue().splitlines()]
+    return summary, {entry["id"]: entry for entry in entries}
+
+
+def test_unknown_template_fails_the_document(tmp_path):
+    out_dir = tmp_path / "pdfs"
+    summary, report = _run(tmp_path, [
+        dict(WARMUP_RESUME, id="good", template="Modern Clean"),
+        dict(WARMUP_RESUME, id="typo", template="Modern"),
+    ], out_dir=str(out_dir))
+    assert summary["failed"] == 1
+    assert report["good"]["ok"] and report["good"]["template"] == "Modern Clean"
+    assert not report["typo"]["ok"]
+    assert report["typo"]["template"] == "Modern"
+    assert "unknown template" in report["typo"]["error"]
+    assert sorted(p.name for p in out_dir.iterdir()) == ["good.pdf"]
+
+
+def test_failure_report(tmp_path):
+    out_dir = tmp_path / "pdfs"
+    summary, report = _run(tmp_path, [
+        dict(WARMUP_RESUME, id="ok"),
+        "{not json",
+        "[1, 2]",
+        # Entries must be a list of dicts: fails inside the render worker
+        dict(WARMUP_RESUME, id="broken", experience=5),
+    ], out_dir=str(out_dir))
+    assert summary["documents"] == 4
+    assert summary["rendered"] == 1
+    assert summary["failed"] == 3
+    assert report["ok"]["ok"] and report["ok"]["bytes"] > 0
+    assert "invalid document" in report["resume_00002"]["error"]
+    assert "invalid document" in report["resume_00003"]["error"]
+    assert not report["broken"]["ok"]
+    # Failed renders leave nothing behind, not even an empty file
+    assert sorted(p.name for p in out_dir.iterdir()) == ["ok.pdf"]
+
+
+def test_zip_output_with_duplicate_ids(tmp_path):
+    zip_path = tmp_path / "out.zip"
+    summary, report = _run(tmp_path, [dict(WARMUP_RESUME, id="same"), dict(WARMUP_RESUME, id="same")],
+                           zip_path=str(zip_path))
+    assert summary["failed"] == 0
+    with zipfile.ZipFile(zip_path) as archive:
+        assert sorted(archive.namelist()) == ["same.pdf", "same_2.pdf"]
+        assert archive.read("same.pdf").startswith(b"%PDF")
+
+
+def test_directory_source_reports_unreadable_files(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps(WARMUP_RESUME), encoding="utf-8")
+    (tmp_path / "b.json").write_text("{", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    documents = list(iter_documents(str(tmp_path)))
+    assert [doc_id for doc_id, _ in documents] == ["a", "b"]
+    assert isinstance(documents[0][1], dict)
+    assert isinstance(documents[1][1], ValueError)
@@ -0,0 +1,46 @@
+from utils.chat_memory import ChatMemory
+from utils.token_budget import estimate_tokens
+
+
+def test_window_keeps_recent_messages():
+    memory = ChatMemory(max_messages=4)
+    for i in range(10):
+        memory.add("user" if i % 2 == 0 else "assistant", f"Message {i}. More detail here.")
+    assert [m["content"] for m in memory.messages] == [f"Message {i}. More detail here." for i in range(6, 10)]
+    assert memory.total_messages == 10
+    assert memory.hidden_count == 6
+
+
+def test_evicted_messages_are_summarised_by_first_sentence():
+    memory = ChatMemory(max_messages=1)
+    memory.add("user", "How do I list skills? I have many.")
+    memory.add("assistant", "Group them by area. Keep it short.")
+    memory.add("user", "Thanks!")
+    assert memory.summary == "User: How do I list skills? Coach: Group them by area."
+
+
+def test_summary_is_bounded_and_keeps_the_newest_part():
+    memory = ChatMemory(max_messages=1, summary_max_tokens=20)
+    for i in range(50):
+        memory.add("user", f"Question number {i} about my resume.")
+    assert estimate_tokens(memory.summary) <= 20
+    assert "number 48" in memory.summary
+
+
+def test_context_messages_lead_with_summary():
+    memory = ChatMemory(max_messages=2)
+    for text in ("First.", "Second.", "Third."):
+        memory.add("user", text)
+    context = memory.context_messages()
+    assert context[0]["role"] == "system"
+    assert "User: First." in context[0]["content"]
+    assert [m["content"] for m in context[1:]] == ["Second.", "Third."]
+
+
+def test_clear():
+    memory = ChatMemory(max_messages=1)
+    memory.add("user", "One.")
+    memory.add("user", "Two.")
+    memory.clear()
+    assert memory.messages == [] and memory.summary == "" and memory.hidden_count == 0
+    assert memory.context_messages() == []
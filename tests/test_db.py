@@ -0,0 +1,154 @@
+"""
+Storage backend tests. They run against a throwaway SQLite file, and also
+against PostgreSQL when DATABASE_URL points at one (pip install -r
+requirements-postgres.txt). Postgres tests only touch their own rows:
+unique emails and activity buckets in 2001.
+"""
+import datetime
+import os
+import uuid
+
+import pytest
+
+from utils import db
+
+POSTGRES_URL = os.environ.get("DATABASE_URL", "")
+T0 = datetime.datetime(2001, 1, 1, 9, 15)
+
+
+def _postgres_backend():
+    if not POSTGRES_URL.startswith(("postgres://", "postgresql://")):
+        pytest.skip("DATABASE_URL is not a PostgreSQL URL")
+    pytest.importorskip("psycopg2")
+    return db.PostgresBackend(POSTGRES_URL)
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def backend(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        backend = db.SQLiteBackend(str(tmp_path / "test.db"))
+    else:
+        backend = _postgres_backend()
+    monkeypatch.setattr(db, "_backend", backend)
+    db.init_db()
+    _clear_test_activity()
+    yield backend
+    _clear_test_activity()
+    backend.close()
+
+
+@pytest.fixture
+def prefix(backend):
+    """Unique email prefix; the test's rows are deleted afterwards."""
+    prefix = f"test-{uuid.uuid4().hex[:8]}-"
+    yield prefix
+    with db.connection() as conn:
+        for table in ("users", "token_usage", "resumes"):
+            conn.execute(f"DELETE FROM {table} WHERE email LIKE ?", (prefix + "%",))
+
+
+def _clear_test_activity():
+    with db.connection() as conn:
+        conn.execute("DELETE FROM activity WHERE bucket LIKE ?", ("2001-%",))
+
+
+def _login(email, when):
+    return (db.LOGIN, email, when, 0, 0)
+
+
+def _usage(email, when, prompt_tokens, completion_tokens):
+    return (db.USAGE, email, when, prompt_tokens, completion_tokens)
+
+
+def _user(email):
+    with db.connection() as conn:
+        return conn.execute("SELECT first_seen, last_seen, login_count FROM users WHERE email = ?",
+                            (email,)).fetchone()
+
+
+def _activity(period, bucket):
+    with db.connection() as conn:
+        return tuple(conn.execute("SELECT logins, active_users, new_users FROM activity "
+                                  "WHERE period = ? AND bucket = ?", (period, bucket)).fetchone())
+
+
+def _as_datetime(value):
+    return datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def test_init_db_is_idempotent(backend):
+    db.init_db()
+    with db.connection() as conn:
+        for table in ("users", "activity", "token_usage", "resumes"):
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+
+
+def test_login_upsert(prefix):
+    email = prefix + "a@example.com"
+    db.write_events([_login(email, T0), _login(email, T0 + datetime.timedelta(minutes=5))])
+    db.write_events([_login(email, T0 - datetime.timedelta(hours=1))])
+    first, last, count = _user(email)
+    assert _as_datetime(first) == T0
+    # An older event must not move last_seen backwards
+    assert _as_datetime(last) == T0 + datetime.timedelta(minutes=5)
+    assert count == 3
+
+
+def test_usage_upsert(prefix):
+    email = prefix + "a@example.com"
+    db.write_events([_usage(email, T0, 10, 5), _usage(email, T0, 1, 2)])
+    db.write_events([_usage(email, T0, 100, 50)])
+    with db.connection() as conn:
+        row = conn.execute("SELECT prompt_tokens, completion_tokens, requests FROM token_usage WHERE email = ?",
+                           (email,)).fetchone()
+    assert tuple(row) == (111, 57, 3)
+
+
+def test_activity_rollups(prefix):
+    a, b = prefix + "a@example.com", prefix + "b@example.com"
+    db.write_events([_login(a, T0), _login(a, T0 + datetime.timedelta(minutes=10)), _login(b, T0)])
+    # a comes back an hour later: active again that hour, but not new, and not new to the day
+    db.write_events([_login(a, T0 + datetime.timedelta(hours=1))])
+    assert _activity("hour", "2001-01-01 09:00") == (3, 2, 2)
+    assert _activity("hour", "2001-01-01 10:00") == (1, 1, 0)
+    assert _activity("day", "2001-01-01") == (4, 2, 2)
+
+
+def test_get_users_pages_by_recency(prefix):
+    emails = [f"{prefix}{i}@example.com" for i in range(5)]
+    db.write_events([_login(email, T0 + datetime.timedelta(minutes=i)) for i, email in enumerate(emails)])
+    # Start just after this test's logins, so a shared database adds nothing newer
+    cursor, pages = (datetime.datetime(2001, 1, 2), ""), []
+    while cursor is not None:
+        page = db.get_users(limit=2, after=cursor)
+        pages.append([user["email"] for user in page["users"]])
+        cursor = page["next"]
+    seen = [email for page in pages for email in page if email.startswith(prefix)]
+    assert seen == emails[::-1]
+    assert len(pages) >= 3
+
+
+def test_resume_round_trip(prefix):
+    email = prefix + "a@example.com"
+    assert db.save_resume_sections([(email, "summary", db.encode_section("first")),
+                                    (email, "skills", db.encode_section(["Python"]))])
+    assert db.save_resume_sections([(email, "summary", db.encode_section("second"))])
+    assert db.load_resume(email) == {"summary": "second", "skills": ["Python"]}
+    db.delete_resume(email)
+    assert db.load_resume(email) == {}
+
+
+def test_event_writer_flush(prefix, backend):
+    email = prefix + "a@example.com"
+    writer = db.EventWriter(interval=60)
+    try:
+        for _ in range(100):
+            writer.log_login(email)
+            writer.record_usage(email, 2, 1)
+        writer.flush()
+        assert _user(email)[2] == 100
+    finally:
+        writer.close()
+    with db.connection() as conn:
+        assert tuple(conn.execute("SELECT prompt_tokens, completion_tokens, requests FROM token_usage "
+                                  "WHERE email = ?", (email,)).fetchone()) == (200, 100, 100)
@@ -0,0 +1,76 @@
+import re
+
+import pytest
+
+from utils.fit_engine import estimate_fit, fit_to_pages, measure_pages, trim_bullets
+from utils.pdf_generator import WARMUP_RESUME, render_resume
+from utils.templates import TEMPLATES
+
+
+def _rendered_pages(data, template):
+    return len(re.findall(rb"/Type /Page\b", render_resume(data, template)))
+
+
+def _resume(entries, bullets=4):
+    description = "\n".join(f"- Delivered measurable improvement number {i} across several teams" for i in range(bullets))
+    return dict(WARMUP_RESUME, experience=[
+        {"role": f"Engineer {i}", "company": "Company", "duration": "2020 - 2024", "description": description}
+        for i in range(entries)
+    ])
+
+
+SHORT, MEDIUM, LONG = _resume(2), _resume(7), _resume(20, bullets=6)
+
+
+@pytest.mark.parametrize("template", list(TEMPLATES))
+@pytest.mark.parametrize("data", [SHORT, MEDIUM, LONG], ids=["short", "medium", "long"])
+def test_measure_pages_matches_real_render(data, template):
+    assert measure_pages(data, template) == _rendered_pages(data, template)
+
+
+@pytest.mark.parametrize("template", list(TEMPLATES))
+@pytest.mark.parametrize("data", [SHORT, MEDIUM, LONG], ids=["short", "medium", "long"])
+def test_fit_result_matches_real_render(data, template):
+    fit = fit_to_pages(data, template, 1)
+    pages = _rendered_pages(fit.data, fit.template)
+    assert pages == fit.pages
+    assert fit.fits == (pages <= 1)
+    # The fitted PDF, as exported, has the same page count
+    fitted = render_resume(data, template, fit_pages=1)
+    assert len(re.findall(rb"/Type /Page\b", fitted)) == pages
+
+
+def test_resume_that_fits_is_left_alone():
+    fit = fit_to_pages(SHORT, "Classic Professional", 1)
+    assert fit.fits and fit.passes == 1
+    assert (fit.font_scale, fit.spacing_scale, fit.max_bullets) == (1.0, 1.0, None)
+    assert fit.data is SHORT
+
+
+def test_fit_respects_max_passes():
+    huge = _resume(60, bullets=8)
+    fit = fit_to_pages(huge, "Classic Professional", 1, max_passes=5)
+    assert fit.passes <= 5
+    assert not fit.fits
+
+
+def test_trim_bullets():
+    data = _resume(1, bullets=5)
+    trimmed = trim_bullets(data, 2)
+    assert trimmed["experience"][0]["description"].count("\n") == 1
+    assert data["experience"][0]["description"].count("\n") == 4
+    assert trim_bullets(data, None) is data
+
+
+def test_estimate_fit_caches_on_content():
+    calls = []
+
+    def run(fn, *args):
+        calls.append(args)
+        return fn(*args)
+
+    first = estimate_fit(MEDIUM, "Modern Clean", 1, run=run)
+    assert estimate_fit(dict(MEDIUM), "Modern Clean", 1, run=run) is first
+    assert len(calls) == 1
+    estimate_fit(dict(MEDIUM, summary="Changed."), "Modern Clean", 1, run=run)
+    assert len(calls) == 2
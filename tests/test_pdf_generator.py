@@ -0,0 +1,98 @@
+import datetime
+
+import fpdf.fpdf
+import pytest
+
+from utils.pdf_generator import WARMUP_RESUME, ResumeGenerator, StreamBuffer, render_resume
+from utils.templates import TEMPLATES
+
+
+class FixedDatetime(datetime.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def fixed_creation_date(monkeypatch):
+    # fpdf stamps /CreationDate with the current time
+    monkeypatch.setattr(fpdf.fpdf, "datetime", FixedDatetime)
+
+
+OTHER_RESUME = dict(
+    WARMUP_RESUME,
+    contact_info={"first_name": "Zoë", "last_name": "Ünal", "email": "z@example.com", "phone": "1"},
+    summary="A much longer summary — with typography “quotes” and Ελληνικά. " * 20,
+    experience=WARMUP_RESUME["experience"] * 8,
+)
+
+# Entries must be a list of dicts; this fails halfway through layout
+BROKEN_RESUME = dict(WARMUP_RESUME, experience=5)
+
+
+@pytest.mark.parametrize("template", list(TEMPLATES))
+def test_reused_generator_output_is_byte_identical(template):
+    generator = ResumeGenerator(template=template)
+    first = generator.render(WARMUP_RESUME)
+    other = generator.render(OTHER_RESUME)
+    again = generator.render(WARMUP_RESUME)
+    assert first == again
+    assert first == ResumeGenerator(WARMUP_RESUME, template).generate()
+    assert other == ResumeGenerator(OTHER_RESUME, template).generate()
+
+
+def test_render_after_failed_render_is_unaffected():
+    generator = ResumeGenerator()
+    expected = generator.render(WARMUP_RESUME)
+    with pytest.raises(Exception):
+        generator.render(BROKEN_RESUME)
+    assert generator.render(WARMUP_RESUME) == expected
+
+
+def test_stream_buffer_writes_in_chunks():
+    written = []
+    buf = StreamBuffer(written.append, chunk_size=10)
+    for piece in ("abcd", "efgh", "ijkl", "é", "mn"):
+        buf += piece
+    assert len(buf) == 15
+    assert written == [b"abcdefghijkl"]
+    buf.flush()
+    assert b"".join(written) == "abcdefghijklémn".encode("latin-1")
+
+
+def test_render_to_path_and_file(tmp_path):
+    expected = render_resume(WARMUP_RESUME)
+    path = tmp_path / "resume.pdf"
+    assert render_resume(WARMUP_RESUME, target=str(path)) == len(expected)
+    assert path.read_bytes() == expected
+    with open(tmp_path / "other.pdf", "wb") as f:
+        render_resume(WARMUP_RESUME, target=f)
+    assert (tmp_path / "other.pdf").read_bytes() == expected
+
+
+def test_failed_render_to_path_leaves_no_file(tmp_path):
+    with pytest.raises(Exception):
+        render_resume(BROKEN_RESUME, target=str(tmp_path / "resume.pdf"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_iter_chunks_matches_render():
+    generator = ResumeGenerator(OTHER_RESUME)
+    expected = generator.render(OTHER_RESUME)
+    chunks = list(generator.iter_chunks(chunk_size=1024))
+    assert len(chunks) > 1
+    assert b"".join(chunks) == expected
+
+
+def test_iter_chunks_closed_early_leaves_generator_usable():
+    generator = ResumeGenerator(OTHER_RESUME)
+    expected = generator.render(OTHER_RESUME)
+    chunks = generator.iter_chunks(chunk_size=256)
+    next(chunks)
+    chunks.close()
+    assert generator.render(OTHER_RESUME) == expected
+
+
+def test_iter_chunks_propagates_errors():
+    with pytest.raises(ValueError):
+        list(ResumeGenerator(None).iter_chunks())
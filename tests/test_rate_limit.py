@@ -0,0 +1,111 @@
+import pytest
+
+from utils import rate_limit
+from utils.rate_limit import CircuitBreaker, RateLimiter, TokenBucket, backoff_delay
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_starts_full_then_charges_wait(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    assert bucket.reserve(10) == 0.0
+    # Empty: the next 4 tokens take 2 seconds to refill
+    assert bucket.reserve(4) == pytest.approx(2.0)
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    bucket.reserve(10)
+    clock.now += 3
+    assert bucket.reserve(6) == 0.0
+    clock.now += 1000
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.5)
+
+
+def test_bucket_oversized_request_waits_for_a_full_bucket(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    assert bucket.reserve(50) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_refund(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    bucket.reserve(10)
+    bucket.refund(4)
+    assert bucket.reserve(4) == 0.0
+
+
+def test_rate_limiter_rejects_beyond_max_wait_and_refunds(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, max_wait=5)
+    assert limiter.acquire(600)
+    # 600 more tokens take a minute to refill: rejected without waiting...
+    assert not limiter.acquire(600)
+    # ...and the rejected reservation was given back
+    clock.now += 60
+    assert limiter.tokens.reserve(600) == 0.0
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow() and breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.retry_in() == pytest.approx(20)
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_trial_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial call goes through
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_breaker_half_open_trial_reopens_on_failure(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_in() == pytest.approx(30)
+
+
+def test_backoff_delay_bounds():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= 4
+    assert 3 <= backoff_delay(0, base=0.5, retry_after=3) <= 3.5
+    assert backoff_delay(0, cap=2, retry_after=60) <= 2.5
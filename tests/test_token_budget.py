@@ -0,0 +1,54 @@
+from utils.token_budget import (TRUNCATION_MARKER, estimate_messages_tokens, estimate_tokens, trim_messages,
+                                truncate_to_tokens)
+
+
+def _message(role, tokens):
+    # 4 characters per token
+    return {"role": role, "content": "x" * (tokens * 4)}
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_messages_tokens([_message("user", 10), _message("assistant", 5)]) == 10 + 4 + 5 + 4
+
+
+def test_truncate_keeps_short_text():
+    assert truncate_to_tokens("short text", 100) == "short text"
+    assert truncate_to_tokens("anything", 0) == ""
+
+
+def test_truncate_keeps_head_and_tail():
+    text = "HEAD " + "middle " * 500 + " TAIL"
+    truncated = truncate_to_tokens(text, 50)
+    assert estimate_tokens(truncated) <= 50
+    assert truncated.startswith("HEAD")
+    assert truncated.endswith("TAIL")
+    assert TRUNCATION_MARKER in truncated
+
+
+def test_trim_keeps_newest_messages_that_fit():
+    messages = [_message("user", 10), _message("assistant", 10), _message("user", 10)]
+    # Each costs 14 with overhead: room for the newest two only
+    assert trim_messages(messages, 30) == messages[1:]
+    assert trim_messages(messages, 100) == messages
+    assert trim_messages(messages, 5) == []
+
+
+def test_trim_stops_at_first_message_that_does_not_fit():
+    messages = [_message("user", 1), _message("assistant", 50), _message("user", 1)]
+    # The small oldest message must not jump the gap left by the large one
+    assert trim_messages(messages, 20) == messages[2:]
+
+
+def test_trim_pins_leading_system_message():
+    summary = _message("system", 10)
+    turns = [_message("user", 10), _message("assistant", 10)]
+    assert trim_messages([summary] + turns, 30) == [summary, turns[1]]
+
+
+def test_trim_drops_system_message_that_alone_exceeds_budget():
+    summary = _message("system", 100)
+    turn = _message("user", 1)
+    assert trim_messages([summary, turn], 10) == [turn]
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def make_cache_key(**request) -> str:
+    """Stable hash of everything that influences a completion (model, prompts, temperature...)."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """In-process LRU cache for LLM responses with size and TTL bounds."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Two-level cache: the in-process LRU in front of a SQLite file, so several
+    Streamlit workers on the same host can share answers.
+
+    Expired rows and rows over max_disk_entries are trimmed every trim_every
+    writes or trim_interval seconds, whichever comes first, so the table can
+    briefly run up to trim_every rows over its cap.
+    """
+
+    def __init__(self, path: str = "ai_cache.db", max_entries: int = 512,
+                 ttl_seconds: float = 3600, max_disk_entries: int = 20000,
+                 trim_every: int = 200, trim_interval: float = 60.0):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.trim_every = trim_every
+        self.trim_interval = trim_interval
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        self._writes_since_trim = 0
+        self._last_trim = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL
+            )
+        ''')
+        # Both trims walk the table by expiry
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_expires_at ON responses (expires_at)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        value = super().get(key)
+        if value is not None:
+            return value
+
+        with self._disk_lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+
+        # Promote to memory; the miss counted above becomes a (disk) hit
+        with self._lock:
+            self.misses -= 1
+            self.hits += 1
+            self.disk_hits += 1
+        super().set(key, row[0])
+        return row[0]
+
+    def set(self, key: str, value: str):
+        super().set(key, value)
+        now = time.time()
+        with self._disk_lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, now + self.ttl_seconds),
+            )
+            self._writes_since_trim += 1
+            if (self._writes_since_trim >= self.trim_every
+                    or time.monotonic() - self._last_trim >= self.trim_interval):
+                self._trim(now)
+            self._conn.commit()
+
+    def _trim(self, now: float):
+        # Caller holds _disk_lock: drop expired rows and cap the table size
+        self._conn.execute('DELETE FROM responses WHERE expires_at < ?', (now,))
+        self._conn.execute('''
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_disk_entries,))
+        self._writes_since_trim = 0
+        self._last_trim = time.monotonic()
+
+    def clear(self):
+        super().clear()
+        with self._disk_lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._disk_lock:
+            disk_entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        stats.update({"backend": "sqlite", "disk_entries": disk_entries, "disk_hits": self.disk_hits})
+        return stats
+
+
+def build_cache(backend: str = "memory", **kwargs) -> Optional[ResponseCache]:
+    """Factory used by AIEngine; backend is 'memory', 'sqlite' or 'none'."""
+    backend = (backend or "memory").lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteResponseCache(**kwargs)
+    kwargs.pop("path", None)
+    kwargs.pop("max_disk_entries", None)
+    return ResponseCache(**kwargs)
@@ -1,37 +1,563 @@
-import os
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
 import streamlit as st
-from groq import Groq
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils import db
+from utils.ai_cache import build_cache, make_cache_key
+from utils.config import get_setting
+from utils.llm_providers import LLMProvider, ProviderError, build_provider
+from utils.rate_limit import CircuitBreaker, RateLimiter, backoff_delay
+from utils.token_budget import estimate_messages_tokens, estimate_tokens, trim_messages, truncate_to_tokens
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Model tiers, smallest first; a task that fails or answers poorly on one tier
+# falls back to the next one. Every field can be overridden with
+# AI_TIER_<NAME>_<FIELD> settings (e.g. AI_TIER_FAST_MODEL).
+TIER_ORDER = ["fast", "large"]
+TIER_DEFAULTS = {
+    "fast": {"model": "llama-3.1-8b-instant", "latency_target": 1.0, "timeout": 10.0, "cost_per_million_tokens": 0.08},
+    "large": {"model": DEFAULT_MODEL, "latency_target": 3.0, "timeout": 60.0, "cost_per_million_tokens": 0.79},
+}
+
+# Which tier each kind of task starts on; override with AI_ROUTE_<TASK>=<tier>
+TASK_ROUTES = {
+    "bullet": {"tier": "fast", "temperature": 0.3},
+    "summary": {"tier": "fast", "temperature": 0.5},
+    "chat": {"tier": "large", "temperature": 0.7},
+    "default": {"tier": "large", "temperature": 0.7},
+}
+
+REFUSAL_PREFIXES = ("as an ai", "i'm sorry", "i am sorry", "i cannot", "i can't")
+
+# Yielded by stream_content(quality_fallback=True) when the text streamed so far
+# was a poor answer and a larger tier starts over; consumers discard what they have
+STREAM_RESTART = object()
+
+# Who to bill token usage to when a call runs off the Streamlit script thread
+# (e.g. batch calls on the engine's event loop): (session usage dict, email)
+_usage_scope = contextvars.ContextVar("usage_scope", default=None)
+
+def current_usage_scope():
+    """The (session usage dict, email) that calls from here are billed to, if any."""
+    scope = _usage_scope.get()
+    if scope is None and get_script_run_ctx() is not None:
+        if "token_usage" not in st.session_state:
+            st.session_state.token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+        scope = (st.session_state.token_usage, st.session_state.get("email"))
+    return scope
+
+def usage_context() -> contextvars.Context:
+    """
+    A copy of the current context that bills token usage to the calling session;
+    run work on another thread with context.run() to keep the attribution.
+    """
+    context = contextvars.copy_context()
+    context.run(_usage_scope.set, current_usage_scope())
+    return context
+
+class AIEngineError(Exception):
+    """The AI provider could not produce a response. The message is safe to show to users."""
+
+class RateLimitedError(AIEngineError):
+    """Our request budget (or the provider's) is exhausted; retry later."""
+
+class CircuitOpenError(AIEngineError):
+    """Too many recent provider failures; calls are paused for a short while."""
+
+@dataclass
+class ModelTier:
+    """A model the router can send work to, with its own budgets and health tracking."""
+    name: str
+    model: str
+    latency_target: float
+    timeout: float
+    cost_per_million_tokens: float
+    rate_limiter: RateLimiter
+    breaker: CircuitBreaker
+
+def _is_low_quality(task: str, content: str) -> bool:
+    """Cheap heuristics for answers worth retrying on a larger model."""
+    text = (content or "").strip().lower()
+    if not text:
+        return True
+    if task in ("bullet", "summary") and len(text) < 20:
+        return True
+    return text.startswith(REFUSAL_PREFIXES)
+
+@dataclass
+class BatchResult:
+    """Outcome of one item in a batch call; exactly one of text/error is set."""
+    index: int
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class AIEngine:
-    def __init__(self):
-        # Try to get key from secrets, else env, else hardcode (fallback)
-        api_key = st.secrets.get("GROQ_API_KEY") or os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in secrets or environment variables.")
-        
-        self.client = Groq(api_key=api_key)
+    def __init__(self, provider: LLMProvider = None):
+        # Backend selected by LLM_PROVIDER: Groq in production, a local stub for
+        # offline load tests. Raises if Groq is selected without an API key.
+        self.provider = provider or build_provider()
+
+        # Response cache: identical (model, system_role, prompt, temperature) requests
+        # are answered locally instead of going back to Groq.
+        self.cache = build_cache(
+            get_setting("AI_CACHE_BACKEND", "memory"),
+            path=get_setting("AI_CACHE_PATH", "ai_cache.db"),
+            max_entries=int(get_setting("AI_CACHE_MAX_ENTRIES", 512)),
+            ttl_seconds=float(get_setting("AI_CACHE_TTL_SECONDS", 3600)),
+        )
+
+        # Model tiers. Groq limits are per model, so each tier gets its own
+        # client-side budgets (rate limiter) and circuit breaker.
+        self.tiers = {}
+        for name in TIER_ORDER:
+            defaults = TIER_DEFAULTS[name]
+            prefix = f"AI_TIER_{name.upper()}_"
+            self.tiers[name] = ModelTier(
+                name=name,
+                model=get_setting(prefix + "MODEL", defaults["model"]),
+                latency_target=float(get_setting(prefix + "LATENCY_TARGET", defaults["latency_target"])),
+                timeout=float(get_setting(prefix + "TIMEOUT", defaults["timeout"])),
+                cost_per_million_tokens=float(get_setting(prefix + "COST_PER_MILLION_TOKENS", defaults["cost_per_million_tokens"])),
+                rate_limiter=RateLimiter(
+                    requests_per_minute=float(get_setting("GROQ_REQUESTS_PER_MINUTE", 30)),
+                    tokens_per_minute=float(get_setting("GROQ_TOKENS_PER_MINUTE", 12000)),
+                    max_wait=float(get_setting("GROQ_MAX_QUEUE_SECONDS", 30)),
+                ),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(get_setting("GROQ_BREAKER_THRESHOLD", 5)),
+                    reset_timeout=float(get_setting("GROQ_BREAKER_RESET_SECONDS", 30)),
+                ),
+            )
+        self.routes = {}
+        for task, route in TASK_ROUTES.items():
+            tier = get_setting(f"AI_ROUTE_{task.upper()}", route["tier"])
+            self.routes[task] = {"tier": tier if tier in self.tiers else route["tier"], "temperature": route["temperature"]}
+        self.max_attempts = int(get_setting("GROQ_MAX_ATTEMPTS", 4))
+        # Tiers with a fallback behind them give up sooner
+        self.fallback_attempts = min(2, self.max_attempts)
+
+        # Prompt size control: user input is truncated to fit max_input_tokens and
+        # completions are capped at max_output_tokens.
+        self.max_input_tokens = int(get_setting("AI_MAX_INPUT_TOKENS", 2000))
+        self.max_output_tokens = int(get_setting("AI_MAX_OUTPUT_TOKENS", 512))
+        self.usage_totals = {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "cost_usd": 0.0}
+        self.tier_usage = {name: {"requests": 0, "tokens": 0, "fallbacks": 0} for name in self.tiers}
+        self._usage_lock = threading.Lock()
+
+        # Async side: provider calls run on a dedicated event loop thread, so sync
+        # Streamlit code can fan out requests without a new loop (and pool) per click.
+        self.max_concurrency = int(get_setting("AI_MAX_CONCURRENCY", 5))
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+        # Recent per-call timings (time-to-first-token and total latency)
+        self.latency_log = deque(maxlen=500)
+        self._latency_lock = threading.Lock()
+
+    def _record_latency(self, mode: str, started: float, first_token_at: float = None, cached: bool = False,
+                        tier: str = None):
+        finished = time.perf_counter()
+        entry = {
+            "mode": mode,
+            "cached": cached,
+            "tier": tier,
+            "ttft": (first_token_at or finished) - started,
+            "total": finished - started,
+        }
+        with self._latency_lock:
+            self.latency_log.append(entry)
+
+    def latency_stats(self) -> dict:
+        """Median/p95 time-to-first-token and total latency over recent calls."""
+        with self._latency_lock:
+            entries = list(self.latency_log)
+        if not entries:
+            return {"calls": 0}
+
+        def pct(values, q):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(q * len(values)))]
+
+        ttft = [e["ttft"] for e in entries]
+        total = [e["total"] for e in entries]
+        return {
+            "calls": len(entries),
+            "streamed": sum(1 for e in entries if e["mode"] == "stream"),
+            "ttft_p50": pct(ttft, 0.5),
+            "ttft_p95": pct(ttft, 0.95),
+            "total_p50": pct(total, 0.5),
+            "total_p95": pct(total, 0.95),
+        }
+
+    def routing_stats(self) -> dict:
+        """Per-tier traffic, latency against target, tokens and estimated cost."""
+        with self._latency_lock:
+            entries = list(self.latency_log)
+        stats = {}
+        for name, tier in self.tiers.items():
+            totals = sorted(e["total"] for e in entries if e["tier"] == name)
+            with self._usage_lock:
+                usage = dict(self.tier_usage[name])
+            stats[name] = {
+                "model": tier.model,
+                "latency_target": tier.latency_target,
+                "latency_p50": totals[len(totals) // 2] if totals else None,
+                "within_target": sum(1 for t in totals if t <= tier.latency_target) / len(totals) if totals else None,
+                "cost_usd": usage["tokens"] * tier.cost_per_million_tokens / 1_000_000,
+                **usage,
+            }
+        return stats
+
+    def usage_stats(self) -> dict:
+        """Process-wide token usage since startup."""
+        with self._usage_lock:
+            return dict(self.usage_totals)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for tuning the response cache."""
+        if self.cache is None:
+            return {"backend": "none"}
+        return self.cache.stats()
+
+    def _record_usage(self, request: dict, tier: ModelTier, usage=None, completion_text: str = ""):
+        """Account tokens process-wide, per tier, per session and per user (persisted in the db)."""
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            prompt_tokens = estimate_messages_tokens(request["messages"])
+            completion_tokens = estimate_tokens(completion_text)
+
+        with self._usage_lock:
+            self.usage_totals["prompt_tokens"] += prompt_tokens
+            self.usage_totals["completion_tokens"] += completion_tokens
+            self.usage_totals["requests"] += 1
+            self.usage_totals["cost_usd"] += (prompt_tokens + completion_tokens) * tier.cost_per_million_tokens / 1_000_000
+            self.tier_usage[tier.name]["requests"] += 1
+            self.tier_usage[tier.name]["tokens"] += prompt_tokens + completion_tokens
+
+        scope = current_usage_scope()
+        if scope is None:
+            return
+        session_usage, email = scope
+        session_usage["prompt_tokens"] += prompt_tokens
+        session_usage["completion_tokens"] += completion_tokens
+        session_usage["requests"] += 1
+        if email:
+            db.record_token_usage(email, prompt_tokens, completion_tokens)
+
+    def _tier_chain(self, task: str) -> List[ModelTier]:
+        """The task's starting tier followed by every larger tier, in fallback order."""
+        start = TIER_ORDER.index(self.routes.get(task, self.routes["default"])["tier"])
+        return [self.tiers[name] for name in TIER_ORDER[start:]]
+
+    def _build_request(self, prompt: str, system_role: str, history: list = None, task: str = "default") -> dict:
+        # Bound the input: the system prompt is ours, so only the user part is trimmed,
+        # then prior conversation gets whatever budget is left (newest turns first).
+        prompt_budget = self.max_input_tokens - estimate_tokens(system_role)
+        prompt = truncate_to_tokens(prompt, max(prompt_budget, 0))
+        messages = [
+            {
+                "role": "system",
+                "content": system_role,
+            }
+        ]
+        if history:
+            history_budget = prompt_budget - estimate_messages_tokens([{"content": prompt}])
+            messages.extend(trim_messages(history, history_budget))
+        messages.append({
+            "role": "user",
+            "content": prompt,
+        })
+        route = self.routes.get(task, self.routes["default"])
+        return {
+            "messages": messages,
+            "model": self.tiers[route["tier"]].model,
+            "temperature": route["temperature"],
+            "max_tokens": self.max_output_tokens,
+        }
+
+    def _cache_lookup(self, request: dict):
+        if self.cache is None:
+            return None, None
+        cache_key = make_cache_key(**request)
+        return cache_key, self.cache.get(cache_key)
+
+    def _estimate_request_tokens(self, request: dict) -> int:
+        # Worst case against the tokens/min budget: full prompt plus the max answer
+        return estimate_messages_tokens(request["messages"]) + request["max_tokens"]
+
+    def _before_attempt(self, tier: ModelTier):
+        if not tier.breaker.allow():
+            raise CircuitOpenError(
+                f"AI service is temporarily unavailable. Please try again in {tier.breaker.retry_in():.0f}s."
+            )
 
-    def generate_content(self, prompt: str, system_role: str = "You are a helpful career assistant.") -> str:
+    def _after_failure(self, exc: Exception, attempt: int, tier: ModelTier, attempts: int) -> float:
+        """Book-keeping for a failed attempt; returns the backoff delay, or raises if we should stop."""
+        if not isinstance(exc, ProviderError) or not exc.retryable:
+            # The provider answered (e.g. 400/401), so it isn't a health problem
+            tier.breaker.record_success()
+            raise AIEngineError(f"AI request failed: {exc}") from exc
+        tier.breaker.record_failure()
+        if attempt + 1 >= attempts:
+            if exc.rate_limited:
+                raise RateLimitedError("AI service is busy right now. Please try again in a moment.") from exc
+            raise AIEngineError(f"AI service did not respond: {exc}") from exc
+        return backoff_delay(attempt, retry_after=exc.retry_after)
+
+    def _call_with_retries(self, request: dict, tier: ModelTier, attempts: int, stream: bool = False):
+        """Run one completion on a tier through its rate limiter, retry/backoff loop and circuit breaker."""
+        request = dict(request, model=tier.model)
+        tokens = self._estimate_request_tokens(request)
+        for attempt in range(attempts):
+            self._before_attempt(tier)
+            if not tier.rate_limiter.acquire(tokens):
+                raise RateLimitedError("Too many AI requests in flight. Please try again in a moment.")
+            try:
+                if stream:
+                    result = self.provider.stream(request, tier.timeout)
+                else:
+                    result = self.provider.complete(request, tier.timeout)
+            except Exception as e:
+                time.sleep(self._after_failure(e, attempt, tier, attempts))
+                continue
+            tier.breaker.record_success()
+            return result
+
+    async def _acall_with_retries(self, request: dict, tier: ModelTier, attempts: int):
+        request = dict(request, model=tier.model)
+        tokens = self._estimate_request_tokens(request)
+        for attempt in range(attempts):
+            self._before_attempt(tier)
+            if not await tier.rate_limiter.aacquire(tokens):
+                raise RateLimitedError("Too many AI requests in flight. Please try again in a moment.")
+            try:
+                result = await self.provider.acomplete(request, tier.timeout)
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(e, attempt, tier, attempts))
+                continue
+            tier.breaker.record_success()
+            return result
+
+    def _note_fallback(self, tier: ModelTier):
+        with self._usage_lock:
+            self.tier_usage[tier.name]["fallbacks"] += 1
+
+    def _complete_routed(self, request: dict, task: str, mode: str) -> str:
+        """
+        Try the task's tiers smallest first. Moves up a tier when a call fails or the
+        answer looks low quality; the last tier's answer is returned as-is.
+        """
+        chain = self._tier_chain(task)
+        content, last_error = None, None
+        for i, tier in enumerate(chain):
+            is_last = i == len(chain) - 1
+            started = time.perf_counter()
+            try:
+                completion = self._call_with_retries(
+                    request, tier, self.max_attempts if is_last else self.fallback_attempts
+                )
+            except AIEngineError as e:
+                last_error = e
+                if not is_last:
+                    self._note_fallback(tier)
+                continue
+            content = completion.content
+            self._record_latency(mode, started, tier=tier.name)
+            self._record_usage(request, tier, completion.usage, content)
+            if is_last or not _is_low_quality(task, content):
+                return content
+            self._note_fallback(tier)
+        if content:
+            return content
+        raise last_error or AIEngineError("The AI returned an empty response. Please try again.")
+
+    async def _acomplete_routed(self, request: dict, task: str) -> str:
+        chain = self._tier_chain(task)
+        content, last_error = None, None
+        for i, tier in enumerate(chain):
+            is_last = i == len(chain) - 1
+            started = time.perf_counter()
+            try:
+                completion = await self._acall_with_retries(
+                    request, tier, self.max_attempts if is_last else self.fallback_attempts
+                )
+            except AIEngineError as e:
+                last_error = e
+                if not is_last:
+                    self._note_fallback(tier)
+                continue
+            content = completion.content
+            self._record_latency("async", started, tier=tier.name)
+            self._record_usage(request, tier, completion.usage, content)
+            if is_last or not _is_low_quality(task, content):
+                return content
+            self._note_fallback(tier)
+        if content:
+            return content
+        raise last_error or AIEngineError("The AI returned an empty response. Please try again.")
+
+    def generate_content(self, prompt: str, system_role: str = "You are a helpful career assistant.",
+                         history: list = None, task: str = "default") -> str:
+        """Blocking completion routed by task. Raises AIEngineError instead of returning error text."""
+        started = time.perf_counter()
+        request = self._build_request(prompt, system_role, history, task)
+        cache_key, cached = self._cache_lookup(request)
+        if cached is not None:
+            self._record_latency("blocking", started, cached=True)
+            return cached
+
+        content = self._complete_routed(request, task, "blocking")
+
+        # Only good completions are cached, keyed on the task's primary tier
+        if cache_key is not None and not _is_low_quality(task, content):
+            self.cache.set(cache_key, content)
+        return content
+
+    def stream_content(self, prompt: str, system_role: str = "You are a helpful career assistant.",
+                       history: list = None, task: str = "default", quality_fallback: bool = False) -> Iterator[str]:
+        """
+        Streaming variant of generate_content: yields text deltas as they arrive.
+        A tier that fails before producing a token hands over to the next tier. Only
+        when the provider can't stream at all do we fall back to the blocking call, so
+        callers can always consume it the same way; other failures have already used
+        up the retry budget and are raised as AIEngineError, like generate_content.
+        Quality fallback needs the whole answer, so it is opt-in: with quality_fallback,
+        a low-quality answer from a smaller tier is followed by STREAM_RESTART and the
+        next tier's answer, and callers must drop the text they received before it.
+        """
+        started = time.perf_counter()
+        request = self._build_request(prompt, system_role, history, task)
+        cache_key, cached = self._cache_lookup(request)
+        if cached is not None:
+            self._record_latency("stream", started, cached=True)
+            yield cached
+            return
+
+        chain = self._tier_chain(task)
+        last_error = None
+        streaming_unsupported = False
+        for i, tier in enumerate(chain):
+            is_last = i == len(chain) - 1
+            tier_started = time.perf_counter()
+            try:
+                stream = self._call_with_retries(
+                    request, tier, self.max_attempts if is_last else self.fallback_attempts, stream=True
+                )
+            except AIEngineError as e:
+                last_error = e
+                streaming_unsupported = isinstance(e.__cause__, NotImplementedError)
+                if not is_last:
+                    self._note_fallback(tier)
+                continue
+
+            parts = []
+            first_token_at = None
+            usage = None
+            try:
+                for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    delta = chunk.content
+                    if not delta:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                tier.breaker.record_failure()
+                if not parts:
+                    last_error = AIEngineError(f"AI service did not respond: {e}")
+                    streaming_unsupported = False
+                    if not is_last:
+                        self._note_fallback(tier)
+                    continue
+                # Part of the answer is already on screen; never let a truncated response be saved
+                self._record_usage(request, tier, None, "".join(parts))
+                raise AIEngineError("The AI response was interrupted. Please try again.") from e
+
+            self._record_latency("stream", tier_started, first_token_at, tier=tier.name)
+            content = "".join(parts)
+            self._record_usage(request, tier, usage, content)
+            if quality_fallback and not is_last and _is_low_quality(task, content):
+                self._note_fallback(tier)
+                yield STREAM_RESTART
+                continue
+            if cache_key is not None and not _is_low_quality(task, content):
+                self.cache.set(cache_key, content)
+            return
+
+        if not streaming_unsupported:
+            raise last_error or AIEngineError("The AI returned an empty response. Please try again.")
+        yield self.generate_content(prompt, system_role, history, task)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ai-engine-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def agenerate_content(self, prompt: str, system_role: str = "You are a helpful career assistant.",
+                                task: str = "default") -> str:
+        """Async generate_content; raises AIEngineError on failure."""
+        started = time.perf_counter()
+        request = self._build_request(prompt, system_role, task=task)
+        cache_key, cached = self._cache_lookup(request)
+        if cached is not None:
+            self._record_latency("async", started, cached=True)
+            return cached
+
+        content = await self._acomplete_routed(request, task)
+        if cache_key is not None and not _is_low_quality(task, content):
+            self.cache.set(cache_key, content)
+        return content
+
+    async def _gather_bounded(self, requests: list, task: str, concurrency: int = None) -> List[BatchResult]:
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+
+        async def run_one(index, prompt, system_role):
+            async with semaphore:
+                try:
+                    return BatchResult(index, text=await self.agenerate_content(prompt, system_role, task))
+                except Exception as e:
+                    return BatchResult(index, error=str(e))
+
+        # gather() preserves input order
+        return await asyncio.gather(*(run_one(i, p, sr) for i, (p, sr) in enumerate(requests)))
+
+    async def optimize_many(self, role: str, texts: List[str], concurrency: int = None) -> List[BatchResult]:
+        """Optimise many bullet points concurrently; results are in input order."""
+        return await self._gather_bounded([self._bullet_prompt(role, t) for t in texts], "bullet", concurrency)
+
+    def optimize_many_sync(self, role: str, texts: List[str], concurrency: int = None) -> List[BatchResult]:
+        """Blocking wrapper around optimize_many for Streamlit callbacks."""
+        if not texts:
+            return []
+        # The coroutine runs on the engine loop with a copy of this context,
+        # so its usage is still billed to the calling session.
+        token = _usage_scope.set(current_usage_scope())
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_role,
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                model="llama-3.3-70b-versatile",
-                temperature=0.7,
+            future = asyncio.run_coroutine_threadsafe(
+                self.optimize_many(role, texts, concurrency), self._get_loop()
             )
-            return chat_completion.choices[0].message.content
-        except Exception as e:
-            return f"Error generating content: {str(e)}"
+        finally:
+            _usage_scope.reset(token)
+        return future.result()
 
-    def optimize_bullet_point(self, role: str, raw_text: str) -> str:
+    def _bullet_prompt(self, role: str, raw_text: str):
         system_prompt = f"""
         You are an expert Resume Writer. Your task is to rewrite the user's bullet point to be ATS-friendly, professional, and impactful.
         Target Role: {role}
@@ -42,15 +568,15 @@ class AIEngine:
         4. Keep it concise (1-2 sentences).
         5. NO emojis.
         """
-        return self.generate_content(raw_text, system_prompt)
+        return raw_text, system_prompt
 
-    def generate_summary(self, role: str, experience_level: str, skills: list) -> str:
+    def _summary_prompt(self, role: str, experience_level: str, skills: list):
         skills_str = ", ".join(skills)
         prompt = f"Draft a professional resume summary for a {role} with {experience_level} experience. Key skills: {skills_str}."
         system_prompt = "Write a concise, high-impact professional summary (3-4 lines max). Use 3rd person implied (no 'I' or 'My')."
-        return self.generate_content(prompt, system_prompt)
+        return prompt, system_prompt
 
-    def chat_with_context(self, section: str, message: str, role: str) -> str:
+    def _chat_prompt(self, section: str, message: str, role: str):
         system_prompt = f"""
         You are a Resume Coach helping a user with the '{section}' section of their resume.
         Target Role: {role}
@@ -61,4 +587,33 @@ class AIEngine:
         3. Provide specific examples and keywords for {role}.
         4. Keep answers brief and actionable.
         """
-        return self.generate_content(message, system_prompt)
+        return message, system_prompt
+
+    def optimize_bullet_point(self, role: str, raw_text: str) -> str:
+        return self.generate_content(*self._bullet_prompt(role, raw_text), task="bullet")
+
+    def generate_summary(self, role: str, experience_level: str, skills: list) -> str:
+        return self.generate_content(*self._summary_prompt(role, experience_level, skills), task="summary")
+
+    def chat_with_context(self, section: str, message: str, role: str, history: list = None) -> str:
+        return self.generate_content(*self._chat_prompt(section, message, role), history=history, task="chat")
+
+    def stream_bullet_point(self, role: str, raw_text: str) -> Iterator[str]:
+        return self.stream_content(*self._bullet_prompt(role, raw_text), task="bullet", quality_fallback=True)
+
+    def stream_summary(self, role: str, experience_level: str, skills: list) -> Iterator[str]:
+        return self.stream_content(*self._summary_prompt(role, experience_level, skills), task="summary",
+                                   quality_fallback=True)
+
+    def stream_chat(self, section: str, message: str, role: str, history: list = None) -> Iterator[str]:
+        return self.stream_content(*self._chat_prompt(section, message, role), history=history, task="chat")
+
+
+@st.cache_resource(show_spinner=False)
+def get_ai_engine() -> AIEngine:
+    """
+    Process-wide AIEngine shared by every session and rerun.
+    Created lazily on first use; st.cache_resource serialises construction,
+    and a failed construction is not cached so the next rerun retries.
+    """
+    return AIEngine()
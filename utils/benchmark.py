@@ -0,0 +1,17 @@
+import statistics
+
+# Shared by the bench_*.py scripts so their reports use the same percentiles
+
+
+def summarize(samples):
+    """count/mean/p50/p95/max of a list of measurements ({"count": 0} when empty)."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
@@ -1,7 +1,44 @@
 import streamlit as st
-from utils.ai_engine import AIEngine
+from utils.ai_engine import AIEngine, AIEngineError
+from utils.chat_memory import ChatMemory
+from utils.jobs import get_job_registry, take_finished
 from utils.resume_data import ResumeBuilder
 
+def submit_reoptimize(ai_engine: AIEngine, key: str, role: str, entries: list):
+    """Queue concurrent re-optimisation of every entry as a background job."""
+    texts = [e['description'] for e in entries]
+    get_job_registry().submit(key, ai_engine.optimize_many_sync, role, texts,
+                              label=f"Optimizing {len(texts)} entries", meta={"texts": texts})
+    st.rerun()
+
+def apply_reoptimize(key: str, entries: list) -> bool:
+    """
+    Fold a finished re-optimisation job back into the entries, keeping failed ones
+    as-is. Returns True if any entry changed.
+    """
+    job = take_finished(key)
+    if job is None:
+        return False
+    if job.error:
+        st.error(job.error)
+        return False
+    failed = edited = 0
+    updated = False
+    for entry, original, result in zip(entries, job.meta["texts"], job.result):
+        # Entries edited or replaced while the job was running keep the user's version
+        if entry['description'] != original:
+            edited += 1
+        elif not result.ok:
+            failed += 1
+        else:
+            entry['description'] = result.text
+            updated = True
+    if failed:
+        st.warning(f"{failed} of {len(job.result)} entries could not be optimized and were left unchanged.")
+    if edited:
+        st.info(f"{edited} of {len(job.result)} entries were edited while optimizing, so your edits were kept.")
+    return updated
+
 def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
     if 'current_section' not in st.session_state:
         st.session_state.current_section = 0
@@ -33,43 +70,60 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
     with st.sidebar:
         st.markdown("---")
         st.subheader(f"🤖 AI Coach ({current_section_name})")
-        if "chat_history" not in st.session_state:
-            st.session_state.chat_history = []
+        if "chat_memory" not in st.session_state:
+            st.session_state.chat_memory = ChatMemory()
+        memory = st.session_state.chat_memory
             
         # Clear chat when section changes
         if "last_section" not in st.session_state:
             st.session_state.last_section = current_section_name
         
         if st.session_state.last_section != current_section_name:
-            st.session_state.chat_history = []
+            memory.clear()
             st.session_state.last_section = current_section_name
 
-        # Display history
-        for msg in st.session_state.chat_history:
+        usage = st.session_state.get("token_usage")
+        if usage:
+            st.caption(f"Tokens used this session: {usage['prompt_tokens'] + usage['completion_tokens']:,}")
+
+        # Only the recent window is rendered; older turns live on as a short summary
+        if memory.hidden_count:
+            with st.expander(f"Earlier conversation ({memory.hidden_count} messages)"):
+                st.caption(memory.summary)
+        for msg in memory.messages:
             st.chat_message(msg["role"]).write(msg["content"])
 
         # Chat input
         if prompt := st.chat_input(f"Ask about {current_section_name}..."):
-            st.session_state.chat_history.append({"role": "user", "content": prompt})
             st.chat_message("user").write(prompt)
             
-            with st.spinner("Thinking..."):
-                response = ai_engine.chat_with_context(current_section_name, prompt, builder.get_role())
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
-                st.chat_message("assistant").write(response)
+            # Stream tokens into the chat bubble as they arrive
+            try:
+                response = st.chat_message("assistant").write_stream(
+                    ai_engine.stream_chat(current_section_name, prompt, builder.get_role(),
+                                          history=memory.context_messages())
+                )
+                memory.add("user", prompt)
+                memory.add("assistant", response)
+            except AIEngineError as e:
+                st.error(str(e))
 
     # --- SECTION LOGIC ---
+    # AI generation runs as background jobs (utils/jobs.py): buttons only submit work,
+    # and results are picked up on a later rerun, so the script thread never blocks.
+    jobs = get_job_registry()
     
     # 1. Contact Information (Form based for efficiency)
     if current_section_name == "Contact Information":
         st.info("Let's start with your contact details so recruiters can reach you.")
+        contact = builder.get_data().get('contact_info') or {}
         with st.form("contact_form"):
             col1, col2 = st.columns(2)
-            first_name = col1.text_input("First Name", placeholder="e.g. John")
-            last_name = col2.text_input("Last Name", placeholder="e.g. Doe")
-            phone = col1.text_input("Phone Number", placeholder="e.g. +1 123 456 7890")
-            linkedin = col2.text_input("LinkedIn URL", placeholder="linkedin.com/in/johndoe")
-            location = st.text_input("Location", placeholder="City, Country")
+            first_name = col1.text_input("First Name", contact.get("first_name", ""), placeholder="e.g. John")
+            last_name = col2.text_input("Last Name", contact.get("last_name", ""), placeholder="e.g. Doe")
+            phone = col1.text_input("Phone Number", contact.get("phone", ""), placeholder="e.g. +1 123 456 7890")
+            linkedin = col2.text_input("LinkedIn URL", contact.get("linkedin", ""), placeholder="linkedin.com/in/johndoe")
+            location = st.text_input("Location", contact.get("location", ""), placeholder="City, Country")
             
             submitted = st.form_submit_button("Save & Continue")
             if submitted:
@@ -102,16 +156,27 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
         
         if st.button("Generate Professional Summary"):
             if user_input:
-                with st.spinner("AI is crafting your summary..."):
-                    # Extract skills from input is hard, so we just pass the text
-                    generated_summary = ai_engine.generate_summary(builder.get_role(), "entry-mid level", [user_input])
-                    st.session_state.generated_summary = generated_summary
+                # Extract skills from input is hard, so we just pass the text
+                jobs.submit("summary", ai_engine.stream_summary, builder.get_role(), "entry-mid level", [user_input],
+                            label="AI is crafting your summary", stream=True)
             else:
                 st.warning("Please provide some input.")
+
+        job = take_finished("summary")
+        if job is not None:
+            if job.error:
+                st.error(job.error)
+            else:
+                st.session_state.generated_summary = job.result
+                # Saved right away so a reconnect doesn't lose (and re-bill) the generation
+                builder.update_section("summary", job.result)
         
         # Display generated or existing summary
+        saved_summary = builder.get_data().get('summary')
+        if 'generated_summary' not in st.session_state and saved_summary:
+            st.session_state.generated_summary = saved_summary
         if 'generated_summary' in st.session_state:
-            st.subheader("AI Suggestion:")
+            st.subheader("Your Summary:")
             final_summary = st.text_area("Edit if needed:", st.session_state.generated_summary, height=150)
             
             if st.button("Save Summary"):
@@ -127,8 +192,11 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
         # Predefined popular skills based on role (Mock list for now, ideally strictly mapped)
         common_skills = ["Python", "SQL", "Java", "React", "AWS", "Docker", "Machine Learning", "Communication"]
         
-        selected_skills = st.multiselect("Select your top skills:", common_skills)
-        custom_skills = st.text_input("Add other skills (comma separated):")
+        saved_skills = builder.get_data().get('skills') or []
+        selected_skills = st.multiselect("Select your top skills:", common_skills,
+                                         default=[s for s in saved_skills if s in common_skills])
+        custom_skills = st.text_input("Add other skills (comma separated):",
+                                      ", ".join(s for s in saved_skills if s not in common_skills))
         
         if st.button("Save Skills"):
             final_skills = selected_skills
@@ -148,7 +216,8 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
         
         # Allow adding multiple entries
         if 'exp_entries' not in st.session_state:
-            st.session_state.exp_entries = []
+            # Start from the saved resume, if one was loaded
+            st.session_state.exp_entries = list(builder.get_data().get('experience') or [])
             
         with st.expander("Add New Position", expanded=True):
             role = st.text_input("Job Title")
@@ -158,21 +227,30 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
             
             if st.button("Optimize & Add Position"):
                 if role and company:
-                    with st.spinner("Optimizing bullet points..."):
-                        optimized_desc = ai_engine.optimize_bullet_point(role, description or f"{role} at {company}")
-                        
-                        entry = {
-                            "role": role,
-                            "company": company,
-                            "duration": duration,
-                            "description": optimized_desc
-                        }
-                        st.session_state.exp_entries.append(entry)
-                        st.success("Position added!")
-                        # Clear inputs? Streamlit forms are tricky, but let's just show the list below
+                    entry = {
+                        "role": role,
+                        "company": company,
+                        "duration": duration,
+                    }
+                    jobs.submit("add_experience", ai_engine.stream_bullet_point, role, description or f"{role} at {company}",
+                                label="Optimizing bullet points", meta=entry, stream=True)
                 else:
                     st.warning("Job Title and Company are required.")
 
+            job = take_finished("add_experience")
+            if job is not None:
+                if job.error:
+                    # Nothing is saved, so error text never ends up in the resume
+                    st.error(job.error)
+                else:
+                    st.session_state.exp_entries.append(dict(job.meta, description=job.result))
+                    builder.update_section("experience", st.session_state.exp_entries)
+                    st.success("Position added!")
+                    # Clear inputs? Streamlit forms are tricky, but let's just show the list below
+
+        if apply_reoptimize("reoptimize_experience", st.session_state.exp_entries):
+            builder.update_section("experience", st.session_state.exp_entries)
+
         # Show added entries
         if st.session_state.exp_entries:
             st.write("---")
@@ -182,6 +260,9 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
                 st.caption(entry['duration'])
                 st.markdown(entry['description'])
                 st.divider()
+
+            if st.button("Re-optimize All Positions"):
+                submit_reoptimize(ai_engine, "reoptimize_experience", builder.get_role(), st.session_state.exp_entries)
         
         if st.button("Finish Experience Section"):
             builder.update_section("experience", st.session_state.exp_entries)
@@ -193,7 +274,8 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
         st.write("Showcase your best projects.")
         
         if 'proj_entries' not in st.session_state:
-            st.session_state.proj_entries = []
+            # Start from the saved resume, if one was loaded
+            st.session_state.proj_entries = list(builder.get_data().get('projects') or [])
             
         with st.expander("Add New Project", expanded=True):
             title = st.text_input("Project Title")
@@ -202,11 +284,20 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
             
             if st.button("Optimize & Add Project"):
                 if title:
-                    with st.spinner("Optimizing..."):
-                        optimized_desc = ai_engine.optimize_bullet_point(builder.get_role(), desc or title)
-                        entry = {"title": title, "tech": tech, "description": optimized_desc}
-                        st.session_state.proj_entries.append(entry)
-                        st.success("Project added!")
+                    jobs.submit("add_project", ai_engine.stream_bullet_point, builder.get_role(), desc or title,
+                                label="Optimizing", meta={"title": title, "tech": tech}, stream=True)
+
+            job = take_finished("add_project")
+            if job is not None:
+                if job.error:
+                    st.error(job.error)
+                else:
+                    st.session_state.proj_entries.append(dict(job.meta, description=job.result))
+                    builder.update_section("projects", st.session_state.proj_entries)
+                    st.success("Project added!")
+
+        if apply_reoptimize("reoptimize_projects", st.session_state.proj_entries):
+            builder.update_section("projects", st.session_state.proj_entries)
         
         if st.session_state.proj_entries:
             st.write("---")
@@ -215,6 +306,9 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
                 st.markdown(p['description'])
                 st.divider()
 
+            if st.button("Re-optimize All Projects"):
+                submit_reoptimize(ai_engine, "reoptimize_projects", builder.get_role(), st.session_state.proj_entries)
+
         if st.button("Finish Projects Section"):
             builder.update_section("projects", st.session_state.proj_entries)
             st.session_state.current_section += 1
@@ -224,11 +318,12 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
     elif current_section_name == "Education":
         st.write("Add your educational background.")
         
+        edu = (builder.get_data().get('education') or [{}])[0]
         with st.form("edu_form"):
-            degree = st.text_input("Degree (e.g. B.Tech Computer Science)")
-            school = st.text_input("University/College")
-            year = st.text_input("Graduation Year")
-            grade = st.text_input("CGPA / Grade (Optional)")
+            degree = st.text_input("Degree (e.g. B.Tech Computer Science)", edu.get("degree", ""))
+            school = st.text_input("University/College", edu.get("school", ""))
+            year = st.text_input("Graduation Year", edu.get("year", ""))
+            grade = st.text_input("CGPA / Grade (Optional)", edu.get("grade", ""))
             
             submitted = st.form_submit_button("Save & Continue")
             if submitted:
@@ -249,7 +344,8 @@ def render_builder(builder: ResumeBuilder, ai_engine: AIEngine):
     elif current_section_name == "Certifications":
         st.write("Any certifications to add?")
         
-        certs = st.text_area("List Certifications (one per line):")
+        certs = st.text_area("List Certifications (one per line):",
+                             "\n".join(builder.get_data().get('certifications') or []))
         
         col1, col2 = st.columns(2)
         with col1:
@@ -0,0 +1,54 @@
+import re
+from typing import Dict, List
+
+from utils.token_budget import estimate_tokens, truncate_to_tokens
+
+
+class ChatMemory:
+    """
+    Conversation memory for the AI Coach: a bounded window of recent messages
+    plus a rolling, compressed summary of everything that fell out of the window.
+    Memory use and per-rerun render cost stay flat however long the session gets.
+    """
+
+    def __init__(self, max_messages: int = 8, summary_max_tokens: int = 250, snippet_tokens: int = 30):
+        self.max_messages = max_messages
+        self.summary_max_tokens = summary_max_tokens
+        self.snippet_tokens = snippet_tokens
+        self.messages: List[Dict[str, str]] = []
+        self.summary = ""
+        self.total_messages = 0
+
+    def add(self, role: str, content: str):
+        self.messages.append({"role": role, "content": content})
+        self.total_messages += 1
+        while len(self.messages) > self.max_messages:
+            self._compress(self.messages.pop(0))
+
+    def _compress(self, message: Dict[str, str]):
+        # Extractive and free: keep the first sentence of each evicted message.
+        # The newest part of the summary matters most, so trim from the front.
+        first_sentence = re.split(r"(?<=[.!?])\s", message["content"].strip(), maxsplit=1)[0]
+        speaker = "User" if message["role"] == "user" else "Coach"
+        snippet = truncate_to_tokens(first_sentence, self.snippet_tokens).replace("\n", " ")
+        summary = f"{self.summary} {speaker}: {snippet}".strip()
+        while estimate_tokens(summary) > self.summary_max_tokens and " " in summary:
+            summary = summary.split(" ", 1)[1]
+        self.summary = summary
+
+    def context_messages(self) -> List[Dict[str, str]]:
+        """History to send to the model (oldest first); the engine trims it to its token budget."""
+        context = []
+        if self.summary:
+            context.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+        context.extend(self.messages)
+        return context
+
+    def clear(self):
+        self.messages = []
+        self.summary = ""
+        self.total_messages = 0
+
+    @property
+    def hidden_count(self) -> int:
+        return self.total_messages - len(self.messages)
@@ -0,0 +1,13 @@
+import os
+import streamlit as st
+
+def get_setting(name: str, default=None):
+    """Read a config value from Streamlit secrets, then the environment."""
+    try:
+        value = st.secrets.get(name)
+    except Exception:
+        # No secrets.toml at all
+        value = None
+    if value is None:
+        value = os.getenv(name, default)
+    return value
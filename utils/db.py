@@ -1,70 +1,699 @@
 import sqlite3
 import datetime
+import atexit
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 import streamlit as st
-import pandas as pd
+
+from utils.config import get_setting
 
 DB_FILE = "resume_app.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    # Create users table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            email TEXT PRIMARY KEY,
-            first_seen TIMESTAMP,
-            last_seen TIMESTAMP,
-            login_count INTEGER
+# Activity rollup periods: name -> bucket label format (also the bucket's sort key)
+ROLLUP_PERIODS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+
+# Applied to every new SQLite connection. WAL lets readers run alongside a writer;
+# synchronous=NORMAL is durable across crashes of the app in WAL mode.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # KiB, i.e. 16 MB
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class StorageBackend:
+    """
+    Database behind the helpers in this module. Queries are written once in
+    the SQL both SQLite and PostgreSQL accept, with ? placeholders; a backend
+    hands out connections with execute()/executemany() and runs each
+    `with connection()` block as one transaction.
+    """
+
+    name = "base"
+
+    def connection(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Local file; the default, and right for a single node. Streamlit runs every
+    script run on a fresh thread, so pooled connections are checked out per
+    operation rather than kept per thread; a connection is only ever used by
+    one thread at a time. Each keeps its prepared statement cache between uses.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=DB_FILE, size=8, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        # timeout is SQLite's busy timeout: wait for a competing writer instead of failing
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False,
+                               cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Unusable (e.g. closed); drop it rather than hand it out again
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _PostgresConnection:
+    """psycopg2 connection with sqlite3's execute()/executemany() shorthands."""
+
+    def __init__(self, conn, extras):
+        self._conn = conn
+        self._extras = extras
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _sql(query):
+        # Our queries contain no literal '?' or '%'
+        return query.replace("?", "%s")
+
+    def execute(self, query, params=()):
+        cursor = self._conn.cursor()
+        cursor.execute(self._sql(query), tuple(params))
+        return cursor
+
+    def executemany(self, query, rows):
+        # One round trip per page of rows instead of per row
+        with self._conn.cursor() as cursor:
+            self._extras.execute_batch(cursor, self._sql(query), list(rows), page_size=500)
+
+
+class PostgresBackend(StorageBackend):
+    """
+    PostgreSQL, shared by every replica of the app. Connections come from a
+    psycopg2 pool of up to `max_connections`; callers wait for a free one
+    instead of failing when the pool is exhausted.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn, min_connections=1, max_connections=10, connect_timeout=5):
+        try:
+            import psycopg2
+            import psycopg2.extras
+            import psycopg2.pool
+        except ImportError as e:
+            raise RuntimeError("DATABASE_URL points at PostgreSQL; install psycopg2-binary to use it.") from e
+        self._psycopg2 = psycopg2
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections, dsn,
+                                                          connect_timeout=connect_timeout)
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            conn = self._pool.getconn()
+            broken = False
+            try:
+                yield _PostgresConnection(conn, self._psycopg2.extras)
+                conn.commit()
+            except BaseException as e:
+                broken = isinstance(e, (self._psycopg2.OperationalError, self._psycopg2.InterfaceError))
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                # Connections lost to a server restart or network error are replaced
+                self._pool.putconn(conn, close=broken or bool(conn.closed))
+
+    def close(self):
+        self._pool.closeall()
+
+
+def build_backend():
+    """
+    Pick the backend from DATABASE_URL: postgresql://... (or postgres://...),
+    sqlite:///path/to/file.db, or unset for SQLite in DB_FILE.
+    """
+    url = get_setting("DATABASE_URL") or ""
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresBackend(
+            url,
+            min_connections=int(get_setting("DB_POOL_MIN", 1)),
+            max_connections=int(get_setting("DB_POOL_SIZE", 10)),
         )
-    ''')
-    conn.commit()
-    conn.close()
+    if url and not url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported DATABASE_URL scheme in {url.split('://')[0]!r} (expected postgresql or sqlite).")
+    return SQLiteBackend(
+        url[len("sqlite:///"):] or DB_FILE,
+        size=int(get_setting("DB_POOL_SIZE", 8)),
+        busy_timeout=float(get_setting("DB_BUSY_TIMEOUT", 5.0)),
+    )
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """The configured backend, built on first use and shared by every thread."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = build_backend()
+        return _backend
+
+def connection():
+    """Borrow a connection for one transaction: committed on success, rolled back on error."""
+    return get_backend().connection()
+
+def init_db():
+    with connection() as conn:
+        # Create users table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                email TEXT PRIMARY KEY,
+                first_seen TIMESTAMP,
+                last_seen TIMESTAMP,
+                login_count INTEGER
+            )
+        ''')
+        # Active-user counts and user pages walk users by recency
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_users_last_seen ON users (last_seen, email)')
+        # Logins, distinct active users and new users per hour/day, kept up to date
+        # by the event writer (history before this table existed is not backfilled)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS activity (
+                period TEXT,
+                bucket TEXT,
+                logins INTEGER DEFAULT 0,
+                active_users INTEGER DEFAULT 0,
+                new_users INTEGER DEFAULT 0,
+                PRIMARY KEY (period, bucket)
+            )
+        ''')
+        # Per-user LLM token usage, keyed like users
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS token_usage (
+                email TEXT PRIMARY KEY,
+                prompt_tokens BIGINT DEFAULT 0,
+                completion_tokens BIGINT DEFAULT 0,
+                requests INTEGER DEFAULT 0,
+                last_used TIMESTAMP
+            )
+        ''')
+        # Saved resumes, one row per section so edits only rewrite what changed
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS resumes (
+                email TEXT,
+                section TEXT,
+                data TEXT,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (email, section)
+            )
+        ''')
 
 def log_login(email):
+    # Queued: the background writer records it, so sign-in never waits on disk
+    get_event_writer().log_login(email)
+
+def record_token_usage(email, prompt_tokens, completion_tokens):
+    get_event_writer().record_usage(email, prompt_tokens, completion_tokens)
+
+def get_token_usage(email):
+    # Include usage still waiting in the event queue
+    get_event_writer().flush()
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        now = datetime.datetime.now()
-        
-        # Check if user exists
-        c.execute('SELECT login_count FROM users WHERE email = ?', (email,))
-        result = c.fetchone()
-        
-        if result:
-            new_count = result[0] + 1
-            c.execute('''
-                UPDATE users 
-                SET last_seen = ?, login_count = ? 
-                WHERE email = ?
-            ''', (now, new_count, email))
-        else:
-            c.execute('''
-                INSERT INTO users (email, first_seen, last_seen, login_count) 
-                VALUES (?, ?, ?, 1)
-            ''', (email, now, now))
-            
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            row = conn.execute('SELECT prompt_tokens, completion_tokens, requests FROM token_usage WHERE email = ?',
+                               (email,)).fetchone()
     except Exception as e:
-        print(f"DB Log Error: {e}")
+        print(f"DB Usage Error: {e}")
+        row = None
+    if not row:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+    return {"prompt_tokens": row[0], "completion_tokens": row[1], "requests": row[2]}
 
 def get_stats():
+    """Headline numbers for an admin view, from indexed aggregates (no full table read)."""
+    get_event_writer().flush()
+    now = datetime.datetime.now()
+    try:
+        with connection() as conn:
+            total_users = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+            active_users = conn.execute('SELECT COUNT(*) FROM users WHERE last_seen > ?',
+                                        (now - datetime.timedelta(days=1),)).fetchone()[0]
+            # Hourly buckets overlapping the last 24h
+            since = (now - datetime.timedelta(hours=23)).strftime(ROLLUP_PERIODS["hour"])
+            logins = conn.execute("SELECT COALESCE(SUM(logins), 0) FROM activity WHERE period = 'hour' AND bucket >= ?",
+                                  (since,)).fetchone()[0]
+    except Exception as e:
+        print(f"DB Stats Error: {e}")
+        return {"total_users": 0, "active_24h": 0, "logins_24h": 0}
+    return {"total_users": total_users, "active_24h": active_users, "logins_24h": logins}
+
+def get_activity(period="hour", limit=48):
+    """Most recent activity rollups for period ('hour' or 'day'), newest first."""
+    if period not in ROLLUP_PERIODS:
+        raise ValueError(f"Unknown activity period {period!r}")
+    try:
+        with connection() as conn:
+            rows = conn.execute('''
+                SELECT bucket, logins, active_users, new_users FROM activity
+                WHERE period = ? ORDER BY bucket DESC LIMIT ?
+            ''', (period, limit)).fetchall()
+    except Exception as e:
+        print(f"DB Stats Error: {e}")
+        rows = []
+    return [{"bucket": b, "logins": l, "active_users": a, "new_users": n} for b, l, a, n in rows]
+
+def get_users(limit=50, after=None):
+    """
+    One page of users, most recently seen first. Pass the returned "next"
+    cursor as `after` for the following page; it is None on the last page.
+    """
+    query = 'SELECT email, first_seen, last_seen, login_count FROM users'
+    params = ()
+    if after is not None:
+        # Keyset pagination: seeks in the (last_seen, email) index, no OFFSET scan
+        query += ' WHERE (last_seen, email) < (?, ?)'
+        params = tuple(after)
+    query += ' ORDER BY last_seen DESC, email DESC LIMIT ?'
+    try:
+        with connection() as conn:
+            rows = conn.execute(query, params + (limit,)).fetchall()
+    except Exception as e:
+        print(f"DB Stats Error: {e}")
+        rows = []
+    users = [{"email": e, "first_seen": f, "last_seen": l, "login_count": c} for e, f, l, c in rows]
+    next_cursor = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+    return {"users": users, "next": next_cursor}
+
+
+# --- EVENT QUEUE ---
+
+LOGIN = "login"
+USAGE = "usage"
+
+def _activity_deltas(conn, events):
+    """
+    (period, bucket) -> [logins, active users, new users] added by the login
+    events. A user counts as active in a bucket on their first login in it,
+    judged against last_seen, so no per-user history has to be kept.
+    """
+    logins = sorted((when, email) for kind, email, when, _, _ in events if kind == LOGIN)
+    emails = list({email for _, email in logins})
+    last_seen = {}
+    for i in range(0, len(emails), 500):
+        chunk = emails[i:i + 500]
+        rows = conn.execute(f'SELECT email, last_seen FROM users WHERE email IN ({",".join("?" * len(chunk))})', chunk)
+        for email, seen in rows:
+            last_seen[email] = datetime.datetime.fromisoformat(seen) if isinstance(seen, str) else seen
+    deltas = {}
+    for when, email in logins:
+        previous = last_seen.get(email)
+        for period, fmt in ROLLUP_PERIODS.items():
+            bucket = when.strftime(fmt)
+            row = deltas.setdefault((period, bucket), [0, 0, 0])
+            row[0] += 1
+            if previous is None or previous.strftime(fmt) != bucket:
+                row[1] += 1
+            if previous is None:
+                row[2] += 1
+        last_seen[email] = when
+    return deltas
+
+def write_events(events):
+    """
+    Fold (kind, email, time, prompt_tokens, completion_tokens) events per user
+    and apply them in one transaction: one upsert per user and table.
+    """
+    logins, usage = {}, {}
+    for kind, email, when, prompt_tokens, completion_tokens in events:
+        if kind == LOGIN:
+            first, last, count = logins.get(email, (when, when, 0))
+            logins[email] = (min(first, when), max(last, when), count + 1)
+        else:
+            tokens = usage.get(email, (0, 0, 0, when))
+            usage[email] = (tokens[0] + prompt_tokens, tokens[1] + completion_tokens, tokens[2] + 1,
+                            max(tokens[3], when))
+    with connection() as conn:
+        if logins:
+            # Needs last_seen from before this batch, so it runs ahead of the upsert
+            conn.executemany('''
+                INSERT INTO activity (period, bucket, logins, active_users, new_users)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(period, bucket) DO UPDATE SET
+                    logins = activity.logins + excluded.logins,
+                    active_users = activity.active_users + excluded.active_users,
+                    new_users = activity.new_users + excluded.new_users
+            ''', [(*key, *row) for key, row in _activity_deltas(conn, events).items()])
+        conn.executemany('''
+            INSERT INTO users (email, first_seen, last_seen, login_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(email) DO UPDATE SET
+                last_seen = CASE WHEN excluded.last_seen > users.last_seen
+                                 THEN excluded.last_seen ELSE users.last_seen END,
+                login_count = users.login_count + excluded.login_count
+        ''', [(email, *row) for email, row in logins.items()])
+        conn.executemany('''
+            INSERT INTO token_usage (email, prompt_tokens, completion_tokens, requests, last_used)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(email) DO UPDATE SET
+                prompt_tokens = token_usage.prompt_tokens + excluded.prompt_tokens,
+                completion_tokens = token_usage.completion_tokens + excluded.completion_tokens,
+                requests = token_usage.requests + excluded.requests,
+                last_used = CASE WHEN excluded.last_used > token_usage.last_used
+                                 THEN excluded.last_used ELSE token_usage.last_used END
+        ''', [(email, *row) for email, row in usage.items()])
+
+
+class EventWriter:
+    """
+    Write-behind queue for login and token usage events. Callers only enqueue;
+    a background thread writes queued events in one transaction every
+    `interval` seconds, or as soon as `batch_size` are waiting. When the queue
+    is full a caller waits up to `put_timeout` and then writes its own event,
+    so a stalled database slows requests down rather than dropping data.
+    """
+
+    def __init__(self, max_queue=10000, batch_size=500, interval=1.0, put_timeout=0.5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._retry = []  # events from failed batches, written ahead of the next one
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._batches = 0
+        self._events_written = 0
+        self._written_inline = 0
+        self._failures = 0
+        self._thread = threading.Thread(target=self._run, name="db-events", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log_login(self, email):
+        self._put((LOGIN, email, datetime.datetime.now(), 0, 0))
+
+    def record_usage(self, email, prompt_tokens, completion_tokens):
+        self._put((USAGE, email, datetime.datetime.now(), prompt_tokens, completion_tokens))
+
+    def _put(self, event):
+        if not self._stop.is_set():
+            try:
+                self._queue.put(event, timeout=self.put_timeout)
+                if self._queue.qsize() >= self.batch_size:
+                    self._wake.set()
+                return
+            except queue.Full:
+                pass
+        # Backpressure (or shutting down): write it from the caller's thread
+        with self._write_lock:
+            self._written_inline += 1
+            self._write_locked([event])
+
+    def _write_locked(self, events):
+        # Caller holds _write_lock
+        events = self._retry + events
+        self._retry = []
+        if not events:
+            return
+        try:
+            write_events(events)
+        except Exception as e:
+            print(f"DB Event Error: {e}")
+            self._failures += 1
+            # Bounded by the queue size so a dead database can't grow memory forever
+            self._retry = events[-self._queue.maxsize:]
+            return
+        self._batches += 1
+        self._events_written += len(events)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Let a burst accumulate for `interval`, unless a full batch is already waiting
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything queued so far; returns once it is committed (or failed)."""
+        while True:
+            # Events only leave the queue under the lock, so a flush that gets the
+            # lock knows every earlier event has been written
+            with self._write_lock:
+                events = []
+                while len(events) < self.batch_size:
+                    try:
+                        events.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write_locked(events)
+            if len(events) < self.batch_size:
+                return
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        with self._write_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "retrying": len(self._retry),
+                "batches": self._batches,
+                "events_written": self._events_written,
+                "written_inline": self._written_inline,
+                "failures": self._failures,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_event_writer():
+    """One background event writer per process, shared by every session."""
+    return EventWriter(
+        max_queue=int(get_setting("DB_EVENT_QUEUE_SIZE", 10000)),
+        batch_size=int(get_setting("DB_EVENT_BATCH_SIZE", 500)),
+        interval=float(get_setting("DB_EVENT_FLUSH_INTERVAL", 1.0)),
+    )
+
+
+# --- RESUME STORAGE ---
+
+def encode_section(value):
+    """Canonical JSON for a resume section, used both for storage and change detection."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+def save_resume_sections(rows):
+    """Upsert (email, section, encoded data) rows in one transaction. Returns True on success."""
+    if not rows:
+        return True
     try:
-        conn = sqlite3.connect(DB_FILE)
-        
-        # Total users
-        df = pd.read_sql_query("SELECT * FROM users", conn)
-        total_users = len(df)
-        
-        # Active in last 24h
-        time_threshold = datetime.datetime.now() - datetime.timedelta(days=1)
-        active_users = len(df[pd.to_datetime(df['last_seen']) > time_threshold])
-        
-        conn.close()
-        return {
-            "total_users": total_users,
-            "active_24h": active_users,
-            "data": df
-        }
+        now = datetime.datetime.now()
+        with connection() as conn:
+            conn.executemany('''
+                INSERT INTO resumes (email, section, data, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(email, section) DO UPDATE SET
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+            ''', [(email, section, data, now) for email, section, data in rows])
+        return True
+    except Exception as e:
+        print(f"DB Resume Error: {e}")
+        return False
+
+def load_resume(email):
+    """Saved sections for a user as {section: value}; empty if nothing was saved."""
+    # Changes still waiting in the autosaver (e.g. from a dropped connection) come first
+    get_resume_autosaver().flush(email)
+    try:
+        with connection() as conn:
+            rows = conn.execute('SELECT section, data FROM resumes WHERE email = ?', (email,)).fetchall()
+    except Exception as e:
+        print(f"DB Resume Error: {e}")
+        return {}
+    return {section: json.loads(data) for section, data in rows}
+
+def delete_resume(email):
+    """Delete a user's saved resume, including changes the autosaver has not written yet."""
+    get_resume_autosaver().delete(email)
+
+def _delete_resume_rows(email):
+    try:
+        with connection() as conn:
+            conn.execute('DELETE FROM resumes WHERE email = ?', (email,))
     except Exception as e:
-        return {"total_users": 0, "active_24h": 0, "data": pd.DataFrame()}
+        print(f"DB Resume Error: {e}")
+
+
+class ResumeAutosaver:
+    """
+    Debounced, batched writer for resume sections. Repeated changes to a section
+    are coalesced, and a user's changes are written once they have been idle for
+    `delay` seconds (or `max_delay` after the first unsaved change), with every
+    due user going out in a single transaction from a background thread.
+    """
+
+    def __init__(self, delay=2.0, max_delay=10.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending = {}  # email -> {section: encoded data}
+        self._first_change = {}
+        self._last_change = {}
+        # Bumped when a user's resume is deleted; rows taken under an older
+        # generation are stale and must not be written
+        self._generation = {}
+        self._cond = threading.Condition()
+        # Held for every database write and delete, so a delete can't interleave
+        # with a write of rows taken before it
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._batches = 0
+        self._rows_written = 0
+        self._failures = 0
+        self._thread = threading.Thread(target=self._run, name="resume-autosave", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def schedule(self, email, sections):
+        """Queue encoded sections ({section: encode_section(value)}) for email."""
+        now = time.monotonic()
+        with self._cond:
+            self._pending.setdefault(email, {}).update(sections)
+            self._first_change.setdefault(email, now)
+            self._last_change[email] = now
+            self._cond.notify()
+
+    def _deadline(self, email):
+        return min(self._last_change[email] + self.delay, self._first_change[email] + self.max_delay)
+
+    def _take(self, emails):
+        # Caller holds the lock
+        rows = []
+        for email in emails:
+            generation = self._generation.get(email, 0)
+            for section, data in self._pending.pop(email, {}).items():
+                rows.append((email, section, data, generation))
+            self._first_change.pop(email, None)
+            self._last_change.pop(email, None)
+        return rows
+
+    def _current(self, rows):
+        # Caller holds the lock
+        return [row for row in rows if self._generation.get(row[0], 0) == row[3]]
+
+    def _write(self, rows):
+        if not rows:
+            return
+        with self._io_lock:
+            with self._cond:
+                rows = self._current(rows)
+            if not rows:
+                return
+            if save_resume_sections([row[:3] for row in rows]):
+                with self._cond:
+                    self._batches += 1
+                    self._rows_written += len(rows)
+                return
+            # Keep the data for the next attempt, without overwriting anything newer
+            now = time.monotonic()
+            with self._cond:
+                self._failures += 1
+                for email, section, data, _ in self._current(rows):
+                    self._pending.setdefault(email, {}).setdefault(section, data)
+                    self._first_change.setdefault(email, now)
+                    self._last_change[email] = now
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = time.monotonic()
+                    due = [email for email in self._pending if self._deadline(email) <= now]
+                    if due:
+                        break
+                    timeout = min((self._deadline(e) for e in self._pending), default=None)
+                    self._cond.wait(None if timeout is None else timeout - now)
+                if self._closed:
+                    return
+                rows = self._take(due)
+            self._write(rows)
+
+    def flush(self, email=None):
+        """Write pending changes now: one user's, or everyone's."""
+        with self._cond:
+            rows = self._take([email] if email is not None else list(self._pending))
+        self._write(rows)
+
+    def delete(self, email):
+        """Drop email's pending changes and delete its stored resume."""
+        with self._io_lock:
+            with self._cond:
+                self._take([email])
+                self._generation[email] = self._generation.get(email, 0) + 1
+            _delete_resume_rows(email)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pending_users": len(self._pending),
+                "pending_sections": sum(len(s) for s in self._pending.values()),
+                "batches": self._batches,
+                "rows_written": self._rows_written,
+                "failures": self._failures,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_resume_autosaver():
+    """One autosave thread per process, shared by every session."""
+    return ResumeAutosaver(
+        delay=float(get_setting("RESUME_AUTOSAVE_DELAY", 2.0)),
+        max_delay=float(get_setting("RESUME_AUTOSAVE_MAX_DELAY", 10.0)),
+    )
@@ -0,0 +1,192 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable, Optional, Union
+
+from utils.pdf_generator import PDF, compile_template, layout
+from utils.templates import TemplateSpec, get_template
+
+# Fit mode: find the gentlest changes that make a resume fit a target page
+# count. Each candidate is measured with a dry-run layout pass (no PDF output),
+# and the number of passes is bounded so it stays interactive.
+
+# Tried in order: tighter spacing first, then smaller type, then fewer bullets
+SPACING_SCALES = (1.0, 0.75, 0.5)
+MIN_FONT_SCALE = 0.8
+FONT_SEARCH_STEPS = 3
+MAX_PASSES = 12
+
+# Sections whose descriptions are bullet lists that may be trimmed
+TRIMMABLE_SECTIONS = ("experience", "projects")
+
+
+@dataclass(frozen=True)
+class FitResult:
+    template: TemplateSpec  # scaled variant to render with
+    data: dict  # resume data, with bullets trimmed if that was needed
+    pages: int
+    fits: bool
+    font_scale: float
+    spacing_scale: float
+    max_bullets: Optional[int]
+    passes: int
+
+
+class MeasurePDF(PDF):
+    """Runs a layout without producing output: only the cursor and page count move."""
+
+    def _out(self, s):
+        pass
+
+    def add_page(self, orientation=''):
+        self.page += 1
+        self.x = self.l_margin
+        self.y = self.t_margin
+
+    def cell(self, w, h=0, txt='', border=0, ln=0, align='', fill=0, link=''):
+        if self.y + h > self.page_break_trigger:
+            self.add_page()
+        self.lasth = h
+        if ln > 0:
+            self.y += h
+            if ln == 1:
+                self.x = self.l_margin
+        else:
+            self.x += w
+
+
+def measure_pages(data: dict, template: Union[str, TemplateSpec]) -> int:
+    """Pages the resume would take, from one dry-run layout pass."""
+    pdf = MeasurePDF(compile_template(template))
+    pdf.new_document()
+    layout(pdf, pdf.plan, data)
+    return pdf.page
+
+
+def scale_template(template: TemplateSpec, font_scale: float = 1.0, spacing_scale: float = 1.0) -> TemplateSpec:
+    """Variant of template with type (and line height) and vertical gaps scaled."""
+    if font_scale == 1.0 and spacing_scale == 1.0:
+        return template
+
+    def sized(style):
+        return replace(style, size=round(style.size * font_scale, 2))
+
+    return replace(
+        template,
+        name_style=sized(template.name_style),
+        contact_style=sized(template.contact_style),
+        heading_style=sized(template.heading_style),
+        body_style=sized(template.body_style),
+        entry_title_style=sized(template.entry_title_style),
+        entry_meta_style=sized(template.entry_meta_style),
+        line_height=template.line_height * font_scale,
+        heading_height=template.heading_height * font_scale,
+        heading_gap=template.heading_gap * spacing_scale,
+        entry_gap=template.entry_gap * spacing_scale,
+        section_gap=template.section_gap * spacing_scale,
+    )
+
+
+def _bullets(description: str) -> list:
+    return [line for line in (description or '').split('\n') if line.strip()]
+
+
+def trim_bullets(data: dict, max_bullets: Optional[int]) -> dict:
+    """Copy of data keeping at most max_bullets description lines per entry."""
+    if max_bullets is None:
+        return data
+    trimmed = dict(data)
+    for section in TRIMMABLE_SECTIONS:
+        if data.get(section):
+            trimmed[section] = [
+                dict(entry, description='\n'.join(_bullets(entry.get('description'))[:max_bullets]))
+                for entry in data[section]
+            ]
+    return trimmed
+
+
+def fit_to_pages(data: dict, template: Union[str, TemplateSpec], target_pages: int = 1,
+                 max_passes: int = MAX_PASSES) -> FitResult:
+    """
+    Find a layout that fits target_pages: tighten spacing, then search for the
+    largest font scale that fits, then trim bullets. Returns the first fitting
+    layout or, if none fits within max_passes, the shortest one tried.
+    """
+    base = template if isinstance(template, TemplateSpec) else get_template(template)
+    passes = 0
+    shortest = None
+
+    def attempt(font_scale, spacing_scale, max_bullets=None):
+        nonlocal passes, shortest
+        passes += 1
+        spec = scale_template(base, font_scale, spacing_scale)
+        trimmed = trim_bullets(data, max_bullets)
+        pages = measure_pages(trimmed, spec)
+        result = FitResult(spec, trimmed, pages, pages <= target_pages,
+                           font_scale, spacing_scale, max_bullets, passes)
+        if shortest is None or pages < shortest.pages:
+            shortest = result
+        return result
+
+    # 1. As designed, then with tighter spacing
+    for spacing in SPACING_SCALES:
+        result = attempt(1.0, spacing)
+        if result.fits or passes >= max_passes:
+            return result if result.fits else shortest
+    spacing = SPACING_SCALES[-1]
+
+    # 2. Largest font scale that fits, by bisection
+    best = attempt(MIN_FONT_SCALE, spacing)
+    if best.fits:
+        low, high = MIN_FONT_SCALE, 1.0
+        for _ in range(FONT_SEARCH_STEPS):
+            if passes >= max_passes:
+                break
+            middle = round((low + high) / 2, 3)
+            result = attempt(middle, spacing)
+            if result.fits:
+                best, low = result, middle
+            else:
+                high = middle
+        return best
+
+    # 3. Smallest type and spacing, dropping trailing bullets until it fits
+    most = max((len(_bullets(entry.get('description')))
+                for section in TRIMMABLE_SECTIONS for entry in data.get(section) or []), default=0)
+    for max_bullets in range(most - 1, 0, -1):
+        if passes >= max_passes:
+            break
+        result = attempt(MIN_FONT_SCALE, spacing, max_bullets)
+        if result.fits:
+            return result
+    return shortest
+
+
+# (template name, resume JSON, target pages) -> FitResult, most recently used last
+_ESTIMATES = OrderedDict()
+_ESTIMATES_MAX = 256
+_estimates_lock = threading.Lock()
+
+
+def estimate_fit(data: dict, template_name: str, target_pages: int = 1,
+                 run: Optional[Callable] = None) -> FitResult:
+    """
+    fit_to_pages cached on resume content, for showing fit status on every rerun.
+    The search takes up to MAX_PASSES layout passes, so callers on the script
+    thread pass run (e.g. RenderPool.call) to do it in a worker process;
+    run(fit_to_pages, data, template_name, target_pages) must return its result.
+    """
+    name = get_template(template_name).name
+    key = (name, json.dumps(data, sort_keys=True, ensure_ascii=False, default=str), target_pages)
+    with _estimates_lock:
+        result = _ESTIMATES.get(key)
+        if result is not None:
+            _ESTIMATES.move_to_end(key)
+            return result
+    result = run(fit_to_pages, data, name, target_pages) if run else fit_to_pages(data, name, target_pages)
+    with _estimates_lock:
+        _ESTIMATES[key] = result
+        while len(_ESTIMATES) > _ESTIMATES_MAX:
+            _ESTIMATES.popitem(last=False)
+    return result
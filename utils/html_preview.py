@@ -0,0 +1,136 @@
+import json
+from functools import lru_cache
+from html import escape
+
+from utils.templates import (TextStyle, contact_details, education_details, experience_title, get_template,
+                             project_title)
+
+# Lightweight HTML/CSS preview of a resume, built from the same TemplateSpec as
+# the PDF so layout choices show up without rendering a PDF. Each section is
+# rendered and cached on its own content, so a rerun only re-renders sections
+# whose data changed.
+
+CSS_FONTS = {
+    "sans": "'DejaVu Sans', Arial, Helvetica, sans-serif",
+    "serif": "'DejaVu Serif', Georgia, 'Times New Roman', serif",
+    "mono": "'DejaVu Sans Mono', Menlo, Consolas, monospace",
+}
+
+ALIGN = {"L": "left", "C": "center", "R": "right"}
+
+
+def _rgb(color) -> str:
+    return "rgb(%d, %d, %d)" % tuple(color)
+
+
+def _text_css(style: TextStyle) -> str:
+    return (
+        f"font-family: {CSS_FONTS.get(style.family, CSS_FONTS['sans'])}; font-size: {style.size}pt; "
+        f"font-weight: {'bold' if 'B' in style.style else 'normal'}; "
+        f"font-style: {'italic' if 'I' in style.style else 'normal'}; color: {_rgb(style.color)};"
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_css(template_name: str) -> str:
+    """Stylesheet for a template, built once per process."""
+    t = get_template(template_name)
+    heading_fill = f"background: {_rgb(t.heading_fill)}; padding: 0.5mm 1mm;" if t.heading_fill else ""
+    heading_rule = f"border-bottom: 0.3mm solid {_rgb(t.accent_color)};" if t.heading_rule else ""
+    header_rule = "border-bottom: 0.3mm solid #000; padding-bottom: 5mm;" if t.header_rule else ""
+    return f"""
+.resume-preview {{ background: #fff; color: #000; max-width: 210mm; padding: {t.margin}mm;
+    box-shadow: 0 1px 4px rgba(0, 0, 0, 0.15); line-height: {t.line_height}mm; }}
+.resume-preview .resume-header {{ text-align: {ALIGN.get(t.header_align, 'left')}; margin-bottom: 5mm; {header_rule} }}
+.resume-preview .resume-name {{ {_text_css(t.name_style)} line-height: 10mm; }}
+.resume-preview .resume-contact {{ {_text_css(t.contact_style)} }}
+.resume-preview .resume-heading {{ {_text_css(t.heading_style)} {heading_fill} {heading_rule}
+    line-height: {t.heading_height}mm; margin: 0 0 {t.heading_gap}mm 0; }}
+.resume-preview .resume-section {{ margin-bottom: {t.section_gap}mm; }}
+.resume-preview .resume-body {{ {_text_css(t.body_style)} white-space: pre-line; }}
+.resume-preview .resume-entry {{ margin-bottom: {t.entry_gap}mm; }}
+.resume-preview .resume-entry-title {{ {_text_css(t.entry_title_style)} }}
+.resume-preview .resume-entry-meta {{ {_text_css(t.entry_meta_style)} }}
+"""
+
+
+# --- SECTION RENDERERS ---
+
+def _heading(template, section) -> str:
+    return f'<div class="resume-heading">{escape(template.title_for(section))}</div>'
+
+
+def _body(text) -> str:
+    return f'<div class="resume-body">{escape(str(text))}</div>'
+
+
+def _entry(title, meta, description) -> str:
+    parts = [f'<div class="resume-entry-title">{escape(title)}</div>']
+    if meta:
+        parts.append(f'<div class="resume-entry-meta">{escape(meta)}</div>')
+    if description:
+        parts.append(_body(description))
+    return f'<div class="resume-entry">{"".join(parts)}</div>'
+
+
+def _render_header(template, contact) -> str:
+    name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip()
+    if template.name_upper:
+        name = name.upper()
+    details = contact_details(contact, template.contact_separator)
+    return (
+        '<div class="resume-header">'
+        f'<div class="resume-name">{escape(name)}</div>'
+        f'<div class="resume-contact">{escape(details)}</div>'
+        '</div>'
+    )
+
+
+def _render_section_body(template, section, value) -> str:
+    if section == 'summary':
+        return _body(value)
+    if section == 'skills':
+        return _body(template.skills_separator.join(value))
+    if section == 'experience':
+        return "".join(_entry(experience_title(e), e.get('duration', ''), e.get('description')) for e in value)
+    if section == 'projects':
+        return "".join(_entry(project_title(p), '', p.get('description')) for p in value)
+    if section == 'education':
+        return "".join(_entry(f"{e.get('degree', '')}", '', education_details(e)) for e in value)
+    if section == 'certifications':
+        return _body("\n".join(f"{template.list_bullet}{item}" for item in value))
+    raise ValueError(f"Template {template.name!r} has unknown section {section!r}")
+
+
+@lru_cache(maxsize=2048)
+def _render_section(template_name: str, section: str, payload: str) -> str:
+    template = get_template(template_name)
+    value = json.loads(payload)
+    if section == 'contact_info':
+        return _render_header(template, value)
+    return (
+        f'<div class="resume-section">{_heading(template, section)}'
+        f'{_render_section_body(template, section, value)}</div>'
+    )
+
+
+def render_section(template_name: str, section: str, value) -> str:
+    """HTML for one section, cached on (template, section, content)."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return _render_section(get_template(template_name).name, section, payload)
+
+
+def render_preview(data: dict, template_name: str) -> str:
+    """Full preview: template stylesheet plus every non-empty section in template order."""
+    template = get_template(template_name)
+    parts = [render_section(template.name, 'contact_info', data.get('contact_info') or {})]
+    for section in template.section_order:
+        value = data.get(section)
+        if value:
+            parts.append(render_section(template.name, section, value))
+    return f'<style>{compile_css(template.name)}</style><div class="resume-preview">{"".join(parts)}</div>'
+
+
+def preview_cache_stats() -> dict:
+    info = _render_section.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
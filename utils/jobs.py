@@ -0,0 +1,141 @@
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import streamlit as st
+
+from utils.ai_engine import STREAM_RESTART, usage_context
+from utils.config import get_setting
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_job_ids = itertools.count(1)
+
+
+class Job:
+    """Handle for a piece of background work; lives in the session's JobRegistry."""
+
+    def __init__(self, key: str, label: str, meta: dict = None):
+        self.id = next(_job_ids)
+        self.key = key
+        self.label = label
+        self.meta = meta or {}
+        self.status = PENDING
+        self.result: Any = None
+        self.error: Optional[str] = None
+        # Text streamed so far, for jobs that produce a token stream
+        self.partial = ""
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+@st.cache_resource(show_spinner=False)
+def get_executor() -> ThreadPoolExecutor:
+    """Worker pool shared by every session in this process."""
+    return ThreadPoolExecutor(
+        max_workers=int(get_setting("AI_JOB_WORKERS", 8)),
+        thread_name_prefix="ai-job",
+    )
+
+
+def _run(job: Job, fn: Callable, args: tuple, stream: bool):
+    # Runs without a Streamlit script context: fn must not touch st.*. Token
+    # usage still reaches the submitting session through the usage context.
+    job.status = RUNNING
+    try:
+        if stream:
+            for delta in fn(*args):
+                if delta is STREAM_RESTART:
+                    # The engine is retrying on a larger model; drop the poor answer
+                    job.partial = ""
+                    continue
+                job.partial += delta
+            job.result = job.partial
+        else:
+            job.result = fn(*args)
+        job.status = DONE
+    except Exception as e:
+        job.error = str(e)
+        job.status = FAILED
+    finally:
+        if not job.done:
+            # BaseExceptions (e.g. SystemExit) get here too; never leave a job running
+            job.error = "Interrupted"
+            job.status = FAILED
+        job.finished_at = time.time()
+
+
+class JobRegistry:
+    """Per-session view of background jobs, keyed by what they are for (e.g. 'summary')."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    def submit(self, key: str, fn: Callable, *args, label: str = "Working", meta: dict = None,
+               stream: bool = False) -> Job:
+        """
+        Run fn(*args) on the shared pool. With stream=True, fn must return an
+        iterator of text deltas, collected into job.partial as they arrive
+        (STREAM_RESTART starts job.partial over).
+        A job already running under the same key is returned instead (double clicks).
+        """
+        existing = self._jobs.get(key)
+        if existing is not None and not existing.done:
+            return existing
+        job = Job(key, label, meta)
+        self._jobs[key] = job
+        job.future = get_executor().submit(usage_context().run, _run, job, fn, args, stream)
+        return job
+
+    def get(self, key: str) -> Optional[Job]:
+        return self._jobs.get(key)
+
+    def pop(self, key: str) -> Optional[Job]:
+        return self._jobs.pop(key, None)
+
+    def running(self) -> list:
+        return [job for job in self._jobs.values() if not job.done]
+
+
+def get_job_registry() -> JobRegistry:
+    if "ai_jobs" not in st.session_state:
+        st.session_state.ai_jobs = JobRegistry()
+    return st.session_state.ai_jobs
+
+
+@st.fragment(run_every=0.5)
+def render_job_progress(key: str):
+    """Poll a running job without rerunning the whole page; triggers a full rerun once it finishes."""
+    job = get_job_registry().get(key)
+    if job is None:
+        return
+    if job.done:
+        st.rerun()
+    with st.container(border=True):
+        st.caption(f"⏳ {job.label}...")
+        if job.partial:
+            st.markdown(job.partial)
+
+
+def take_finished(key: str) -> Optional[Job]:
+    """
+    Return (and forget) the job under key once it has finished; while it is
+    still running, render its progress and return None.
+    """
+    registry = get_job_registry()
+    job = registry.get(key)
+    if job is None:
+        return None
+    if job.done:
+        return registry.pop(key)
+    render_job_progress(key)
+    return None
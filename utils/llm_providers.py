@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import httpx
+from groq import (
+    APIConnectionError, AsyncGroq, DefaultAsyncHttpxClient, DefaultHttpxClient,
+    Groq, InternalServerError, RateLimitError,
+)
+from utils.config import get_setting
+
+
+@dataclass
+class Usage:
+    prompt_tokens: int
+    completion_tokens: int
+
+
+@dataclass
+class Completion:
+    content: str
+    usage: Optional[Usage] = None
+
+
+@dataclass
+class StreamDelta:
+    """One streamed piece of a completion; usage is set on the final delta when known."""
+    content: str = ""
+    usage: Optional[Usage] = None
+
+
+class ProviderError(Exception):
+    """
+    A failed provider call, normalised so the engine's retry logic doesn't need
+    to know which backend it talks to.
+    """
+
+    def __init__(self, message: str, retryable: bool = False, rate_limited: bool = False,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+
+
+class LLMProvider:
+    """
+    Backend interface behind AIEngine. `request` is an OpenAI-style chat payload
+    (messages, model, temperature, max_tokens).
+    """
+
+    name = "base"
+
+    def complete(self, request: dict, timeout: float) -> Completion:
+        raise NotImplementedError
+
+    def stream(self, request: dict, timeout: float) -> Iterator[StreamDelta]:
+        raise NotImplementedError
+
+    async def acomplete(self, request: dict, timeout: float) -> Completion:
+        raise NotImplementedError
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    def __init__(self, api_key: str, pool_size: int = 20, timeout: float = 60, keepalive: float = 30):
+        self._api_key = api_key
+        self._pool_size = pool_size
+        self._timeout = timeout
+        # One keep-alive connection pool per provider; the engine owning it is shared
+        # process-wide, so TLS setup is paid once, not per rerun.
+        self.client = Groq(
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=0,  # retries are scheduled by the engine, see AIEngine._call_with_retries
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=keepalive,
+                ),
+            ),
+        )
+        self._async_client = None
+
+    def _get_async_client(self):
+        # Async clients are bound to the event loop they're first used on;
+        # AIEngine only calls acomplete() from its own long-lived loop.
+        if self._async_client is None:
+            self._async_client = AsyncGroq(
+                api_key=self._api_key,
+                timeout=self._timeout,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=self._pool_size,
+                        max_keepalive_connections=self._pool_size,
+                    ),
+                ),
+            )
+        return self._async_client
+
+    @staticmethod
+    def _translate(exc: Exception) -> ProviderError:
+        retry_after = None
+        response = getattr(exc, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        # Transient failures worth retrying: 429s, 5xx, network/timeouts
+        retryable = isinstance(exc, (RateLimitError, InternalServerError, APIConnectionError))
+        return ProviderError(str(exc), retryable=retryable,
+                             rate_limited=isinstance(exc, RateLimitError), retry_after=retry_after)
+
+    @staticmethod
+    def _usage(usage) -> Optional[Usage]:
+        if usage is None:
+            return None
+        return Usage(usage.prompt_tokens, usage.completion_tokens)
+
+    def complete(self, request: dict, timeout: float) -> Completion:
+        try:
+            chat_completion = self.client.chat.completions.create(**request, timeout=timeout)
+        except Exception as e:
+            raise self._translate(e) from e
+        return Completion(chat_completion.choices[0].message.content, self._usage(chat_completion.usage))
+
+    def stream(self, request: dict, timeout: float) -> Iterator[StreamDelta]:
+        try:
+            stream = self.client.chat.completions.create(**request, timeout=timeout, stream=True)
+        except Exception as e:
+            raise self._translate(e) from e
+        return self._iter_stream(stream)
+
+    def _iter_stream(self, stream) -> Iterator[StreamDelta]:
+        try:
+            for chunk in stream:
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                usage = self._usage(getattr(x_groq, "usage", None)) if x_groq is not None else None
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta or usage:
+                    yield StreamDelta(delta or "", usage)
+        except Exception as e:
+            raise self._translate(e) from e
+
+    async def acomplete(self, request: dict, timeout: float) -> Completion:
+        try:
+            chat_completion = await self._get_async_client().chat.completions.create(**request, timeout=timeout)
+        except Exception as e:
+            raise self._translate(e) from e
+        return Completion(chat_completion.choices[0].message.content, self._usage(chat_completion.usage))
+
+
+class StubProvider(LLMProvider):
+    """
+    Deterministic offline provider for load tests and benchmarks.
+
+    Time to first token follows a log-normal distribution around `latency_ms`,
+    tokens then arrive at `tokens_per_second`, and `error_rate` of calls fail with a
+    retryable error (a third of them as 429s). The answer is derived from a hash of
+    the request, so identical requests always get identical text.
+    """
+
+    name = "stub"
+
+    WORDS = ("Led", "built", "scalable", "services", "improving", "latency", "by", "[X]%",
+             "and", "reducing", "costs", "across", "cross-functional", "teams", "delivering",
+             "measurable", "impact", "for", "stakeholders", "using", "modern", "tooling")
+
+    def __init__(self, latency_ms: float = 300, latency_sigma: float = 0.5, error_rate: float = 0.0,
+                 tokens_per_second: float = 250, response_tokens: int = 40, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _sample(self):
+        with self._rng_lock:
+            ttft = self.latency_ms / 1000 * math.exp(self._rng.gauss(0, self.latency_sigma))
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            rate_limited = roll < self.error_rate / 3
+            raise ProviderError("stub: simulated 429" if rate_limited else "stub: simulated 503",
+                                retryable=True, rate_limited=rate_limited)
+        return ttft
+
+    def _answer(self, request: dict) -> str:
+        digest = hashlib.sha256(repr(request["messages"]).encode("utf-8")).digest()
+        prompt_words = re.findall(r"[A-Za-z]{4,}", request["messages"][-1]["content"])[:6]
+        words = []
+        limit = min(self.response_tokens, request.get("max_tokens") or self.response_tokens)
+        for i in range(limit):
+            if prompt_words and i % 5 == 2:
+                words.append(prompt_words[i % len(prompt_words)].lower())
+            else:
+                words.append(self.WORDS[digest[i % len(digest)] % len(self.WORDS)])
+        text = " ".join(words)
+        return text[:1].upper() + text[1:] + "."
+
+    def _usage(self, request: dict, content: str) -> Usage:
+        prompt_chars = sum(len(m["content"]) for m in request["messages"])
+        return Usage(prompt_chars // 4, len(content.split()))
+
+    def complete(self, request: dict, timeout: float) -> Completion:
+        ttft = self._sample()
+        content = self._answer(request)
+        time.sleep(ttft + len(content.split()) / self.tokens_per_second)
+        return Completion(content, self._usage(request, content))
+
+    def stream(self, request: dict, timeout: float) -> Iterator[StreamDelta]:
+        ttft = self._sample()
+        content = self._answer(request)
+        return self._iter_stream(request, content, ttft)
+
+    def _iter_stream(self, request: dict, content: str, ttft: float) -> Iterator[StreamDelta]:
+        time.sleep(ttft)
+        for word in content.split(" "):
+            yield StreamDelta(word + " ")
+            time.sleep(1 / self.tokens_per_second)
+        yield StreamDelta(usage=self._usage(request, content))
+
+    async def acomplete(self, request: dict, timeout: float) -> Completion:
+        ttft = self._sample()
+        content = self._answer(request)
+        await asyncio.sleep(ttft + len(content.split()) / self.tokens_per_second)
+        return Completion(content, self._usage(request, content))
+
+
+def build_provider() -> LLMProvider:
+    """Pick the backend from LLM_PROVIDER ('groq' by default, or 'stub')."""
+    kind = (get_setting("LLM_PROVIDER", "groq") or "groq").lower()
+    if kind == "stub":
+        return StubProvider(
+            latency_ms=float(get_setting("STUB_LATENCY_MS", 300)),
+            latency_sigma=float(get_setting("STUB_LATENCY_SIGMA", 0.5)),
+            error_rate=float(get_setting("STUB_ERROR_RATE", 0.0)),
+            tokens_per_second=float(get_setting("STUB_TOKENS_PER_SECOND", 250)),
+            response_tokens=int(get_setting("STUB_RESPONSE_TOKENS", 40)),
+            seed=int(get_setting("STUB_SEED", 0)),
+        )
+    if kind != "groq":
+        raise ValueError(f"Unknown LLM_PROVIDER '{kind}' (expected 'groq' or 'stub').")
+
+    # Try to get key from secrets, else env
+    api_key = get_setting("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY not found in secrets or environment variables.")
+    return GroqProvider(
+        api_key=api_key,
+        pool_size=int(get_setting("GROQ_POOL_SIZE", 20)),
+        timeout=float(get_setting("GROQ_TIMEOUT_SECONDS", 60)),
+        keepalive=float(get_setting("GROQ_KEEPALIVE_SECONDS", 30)),
+    )
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import streamlit as st
+
+from utils.config import get_setting
+from utils.pdf_generator import RENDERER_VERSION
+
+
+def resume_cache_key(data: dict, template: str, **options) -> str:
+    """Stable content hash of everything that affects the rendered PDF."""
+    payload = json.dumps(
+        {"data": data, "template": template, "options": options, "renderer": RENDERER_VERSION},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PDFCache:
+    """
+    Rendered PDFs keyed by resume content hash. Memory is bounded by total bytes
+    (LRU); entries evicted from memory can spill to a directory on disk.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, spill_dir: Optional[str] = None,
+                 max_spill_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self._entries = OrderedDict()  # key -> bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, key + ".pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf
+
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), "rb") as f:
+                    pdf = f.read()
+            except OSError:
+                pdf = None
+            if pdf is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self.put(key, pdf)
+                return pdf
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, pdf: bytes):
+        if len(pdf) > self.max_bytes:
+            self._spill(key, pdf)
+            return
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = pdf
+            self._size += len(pdf)
+            while self._size > self.max_bytes:
+                old_key, old_pdf = self._entries.popitem(last=False)
+                self._size -= len(old_pdf)
+                evicted.append((old_key, old_pdf))
+        for old_key, old_pdf in evicted:
+            self._spill(old_key, old_pdf)
+
+    def _spill(self, key: str, pdf: bytes):
+        if not self.spill_dir:
+            return
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, path)
+            self._trim_spill()
+        except OSError as e:
+            print(f"PDF cache spill error: {e}")
+
+    def _trim_spill(self):
+        files = []
+        for name in os.listdir(self.spill_dir):
+            if name.endswith(".pdf"):
+                path = os.path.join(self.spill_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_spill_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def get_or_render(self, data: dict, template: str, render: Callable[..., bytes], **options) -> bytes:
+        """
+        Serve the PDF for (data, template, options) from cache, calling
+        render(data, template, **options) only on a miss.
+        """
+        key = resume_cache_key(data, template, **options)
+        pdf = self.get(key)
+        if pdf is None:
+            pdf = render(data, template, **options)
+            self.put(key, pdf)
+        return pdf
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_cache() -> PDFCache:
+    """Process-wide PDF cache shared by every session."""
+    return PDFCache(
+        max_bytes=int(get_setting("PDF_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+        spill_dir=get_setting("PDF_CACHE_SPILL_DIR"),
+        max_spill_bytes=int(get_setting("PDF_CACHE_MAX_SPILL_BYTES", 512 * 1024 * 1024)),
+    )
@@ -0,0 +1,222 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+import fpdf
+import fpdf.fpdf
+from fpdf.ttfonts import TTFontFile
+
+# Unicode TrueType fonts for PDF output, with everything expensive cached per
+# process: fpdf would otherwise re-parse the TTF for metrics on every
+# add_font() and again for subsetting on every output().
+#
+# Read from the environment directly (not utils.config) so render worker
+# processes never have to import streamlit.
+#
+# This module (and PDF._putTTfontwidths in pdf_generator) relies on PyFPDF
+# internals: the TTFontFile global in fpdf.fpdf, the font dict schema and the
+# font output methods. It was written against fpdf 1.7.2 exactly (pinned in
+# requirements.txt); on any other version Unicode fonts are disabled and PDFs
+# use the latin-1 core fonts rather than risk corrupt output.
+SUPPORTED_FPDF_VERSION = "1.7.2"
+UNICODE_FONTS_ENABLED = getattr(fpdf, "FPDF_VERSION", None) == SUPPORTED_FPDF_VERSION
+if not UNICODE_FONTS_ENABLED:
+    print(f"fpdf {getattr(fpdf, 'FPDF_VERSION', '?')} is not {SUPPORTED_FPDF_VERSION}; "
+          "Unicode PDF fonts disabled, falling back to core fonts.")
+
+# DejaVu ships with the repo (fonts/dejavu, see its README for licence and script
+# coverage): Latin, Greek and Cyrillic are fully covered; Hebrew and Arabic glyphs
+# exist in Sans but fpdf 1.7.2 does no right-to-left layout or shaping, and CJK,
+# Indic and Thai are not covered at all (they render as missing glyphs).
+# PDF_FONT_DIR can point at another set of DejaVu-named TTFs; system directories
+# are only searched when the bundled copy has been removed.
+BUNDLED_FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts", "dejavu")
+
+FONT_DIRS = [d for d in (
+    os.getenv("PDF_FONT_DIR"),
+    BUNDLED_FONT_DIR,
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/usr/local/share/fonts",
+    "/Library/Fonts",
+) if d]
+
+# Logical template family -> (fpdf family name, {style: TTF file name})
+UNICODE_FAMILIES = {
+    "sans": ("dejavusans", {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf",
+                            "I": "DejaVuSans-Oblique.ttf", "BI": "DejaVuSans-BoldOblique.ttf"}),
+    "serif": ("dejavuserif", {"": "DejaVuSerif.ttf", "B": "DejaVuSerif-Bold.ttf",
+                              "I": "DejaVuSerif-Italic.ttf", "BI": "DejaVuSerif-BoldItalic.ttf"}),
+    "mono": ("dejavusansmono", {"": "DejaVuSansMono.ttf", "B": "DejaVuSansMono-Bold.ttf",
+                                "I": "DejaVuSansMono-Oblique.ttf", "BI": "DejaVuSansMono-BoldOblique.ttf"}),
+}
+
+# Nearest installed style when a variant (typically italic) is missing
+STYLE_FALLBACKS = {"": ("",), "B": ("B", ""), "I": ("I", ""), "BI": ("BI", "B", "I", "")}
+
+# Typography the LLM likes to produce, mapped to latin-1 for the core-font fallback
+LATIN1_REPLACEMENTS = {
+    "‘": "'", "’": "'", "‚": "'", "“": '"', "”": '"', "„": '"',
+    "–": "-", "—": "-", "−": "-", "•": "-", "●": "-", "…": "...",
+    " ": " ", " ": " ", "​": "",
+}
+_LATIN1_PATTERN = re.compile("|".join(map(re.escape, LATIN1_REPLACEMENTS)))
+
+
+def to_latin1(text: str) -> str:
+    """Make text safe for core PDF fonts: map common typography, replace the rest with '?'."""
+    text = _LATIN1_PATTERN.sub(lambda m: LATIN1_REPLACEMENTS[m.group(0)], text)
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+@lru_cache(maxsize=None)
+def find_font_file(filename: str) -> Optional[str]:
+    for directory in FONT_DIRS:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def resolve_font(family: str, style: str):
+    """
+    Map a logical family/style to (fpdf family, style, TTF path), using the
+    nearest installed style. Returns None when no TTF is available.
+    """
+    if not UNICODE_FONTS_ENABLED or family not in UNICODE_FAMILIES:
+        return None
+    name, files = UNICODE_FAMILIES[family]
+    for candidate in STYLE_FALLBACKS.get(style, (style, "")):
+        path = find_font_file(files[candidate])
+        if path:
+            return name, candidate, path
+    return None
+
+
+@lru_cache(maxsize=None)
+def font_metrics(path: str) -> dict:
+    """Parse a TTF once per process; mirrors what FPDF.add_font(uni=True) computes."""
+    ttf = TTFontFile()
+    ttf.getMetrics(path)
+    return {
+        'name': re.sub('[ ()]', '', ttf.fullName),
+        'desc': {
+            'Ascent': int(round(ttf.ascent, 0)),
+            'Descent': int(round(ttf.descent, 0)),
+            'CapHeight': int(round(ttf.capHeight, 0)),
+            'Flags': ttf.flags,
+            'FontBBox': "[%s %s %s %s]" % tuple(int(round(b, 0)) for b in ttf.bbox),
+            'ItalicAngle': int(ttf.italicAngle),
+            'StemV': int(round(ttf.stemV, 0)),
+            'MissingWidth': int(round(ttf.defaultWidth, 0)),
+        },
+        'up': round(ttf.underlinePosition),
+        'ut': round(ttf.underlineThickness),
+        'cw': ttf.charWidths,
+        'originalsize': os.stat(path).st_size,
+    }
+
+
+class SubsetList(list):
+    """
+    fpdf records every character drawn in font['subset'] (duplicates included)
+    and later tests membership for each of ~65k glyphs. Keeping it unique with
+    a set index turns that from quadratic into linear.
+    """
+
+    def __init__(self, items=()):
+        super().__init__()
+        self._seen = set()
+        for item in items:
+            self.append(item)
+
+    def append(self, item):
+        if item not in self._seen:
+            self._seen.add(item)
+            super().append(item)
+
+    def __contains__(self, item):
+        return item in self._seen
+
+    def __delitem__(self, index):
+        self._seen.discard(self[index])
+        super().__delitem__(index)
+
+
+def register_font(pdf, family: str, style: str, path: str):
+    """Add a TTF to pdf from the metrics cache (the in-memory equivalent of add_font)."""
+    fontkey = family + style
+    if fontkey in pdf.fonts:
+        return
+    metrics = font_metrics(path)
+    pdf.fonts[fontkey] = {
+        'i': len(pdf.fonts) + 1, 'type': 'TTF',
+        'name': metrics['name'], 'desc': metrics['desc'],
+        'up': metrics['up'], 'ut': metrics['ut'],
+        'cw': metrics['cw'],  # shared read-only across documents
+        'ttffile': path, 'fontkey': fontkey,
+        'subset': SubsetList(range(0, 32)), 'unifilename': None,
+    }
+    pdf.font_files[fontkey] = {'length1': metrics['originalsize'], 'type': "TTF", 'ttffile': path}
+
+
+# --- SUBSET CACHE ---
+# Resumes mostly draw the same few hundred characters, so the embedded subset
+# for a given character set is reused instead of re-parsing the TTF per render.
+
+_SUBSET_CACHE_SIZE = 128
+_subset_cache = OrderedDict()
+_subset_lock = threading.Lock()
+
+
+class CachedTTFontFile(TTFontFile):
+    def makeSubset(self, file, subset):
+        key = (file, frozenset(subset))
+        with _subset_lock:
+            cached = _subset_cache.get(key)
+            if cached is not None:
+                _subset_cache.move_to_end(key)
+        if cached is None:
+            stream = super().makeSubset(file, subset)
+            cached = (stream, self.codeToGlyph, self.maxUni)
+            with _subset_lock:
+                _subset_cache[key] = cached
+                while len(_subset_cache) > _SUBSET_CACHE_SIZE:
+                    _subset_cache.popitem(last=False)
+        stream, self.codeToGlyph, self.maxUni = cached
+        return stream
+
+
+# FPDF._putfonts instantiates TTFontFile from its module globals; there is no
+# hook to pass a subclass in, so swap the name there. Process-wide, and only
+# safe on the fpdf version this was written against (1.7.2, see above).
+if UNICODE_FONTS_ENABLED:
+    fpdf.fpdf.TTFontFile = CachedTTFontFile
+
+
+# --- GLYPH WIDTH CACHE ---
+# FPDF._putTTfontwidths walks every code point up to maxUni (~65k) per font per
+# render. Its output only depends on the font and the non-latin-1 characters used.
+
+_widths_cache = OrderedDict()
+_widths_lock = threading.Lock()
+
+
+def cached_font_widths(font, max_uni, emit):
+    """Return the PDF lines for a font's /W array, computing them with emit() on a miss."""
+    key = (font['ttffile'], max_uni, frozenset(c for c in font['subset'] if c > 255))
+    with _widths_lock:
+        lines = _widths_cache.get(key)
+        if lines is not None:
+            _widths_cache.move_to_end(key)
+            return lines
+    lines = emit()
+    with _widths_lock:
+        _widths_cache[key] = lines
+        while len(_widths_cache) > _SUBSET_CACHE_SIZE:
+            _widths_cache.popitem(last=False)
+    return lines
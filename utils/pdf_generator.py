@@ -1,121 +1,458 @@
+import io
+import os
+import queue
+import threading
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterator, NamedTuple, Tuple
+
 from fpdf import FPDF
-import streamlit as st
+
+from utils.pdf_fonts import cached_font_widths, register_font, resolve_font, to_latin1
+from utils.templates import (DEFAULT_TEMPLATE, TEMPLATES, TemplateSpec, TextStyle, contact_details,
+                             education_details, experience_title, get_template, project_title)
+
+# Bump whenever layout/output changes so cached PDFs are not reused
+RENDERER_VERSION = "3"
+
+# Core PDF font for each logical template family, used when no Unicode TTF is installed
+CORE_FONTS = {"sans": "Arial", "serif": "Times", "mono": "Courier"}
+
+# Bottom margin at which content flows onto a new page, in mm
+PAGE_BREAK_MARGIN = 15
+
+# Size of the byte chunks streamed out of a finished document
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# Chunks iter_chunks lets the writer thread get ahead of its consumer
+ITER_CHUNKS_AHEAD = 4
+
+# Text roles a template styles; see TemplateSpec
+STYLE_ROLES = ("name", "contact", "heading", "body", "entry_title", "entry_meta", "footer")
+
+# (font key, text) -> width in 1/1000 em. fpdf re-sums glyph widths on every call,
+# and multi_cell calls it per character for TTF fonts; widths scale with size.
+_STRING_WIDTHS: Dict[Tuple[str, str], float] = {}
+_STRING_WIDTHS_MAX = 100_000
+
+
+class RenderPlan(NamedTuple):
+    """A template compiled for fpdf: fonts resolved and section renderers bound, in order."""
+    template: TemplateSpec
+    styles: Dict[str, Tuple[str, str, float, tuple, str]]  # role -> (font, style, size, rgb, TTF path or None)
+    steps: Tuple[Tuple[str, Callable], ...]  # (resume data key, render(pdf, value))
+
+
+class StreamBuffer:
+    """
+    Drop-in for FPDF.buffer, which fpdf only grows with += and measures with
+    len() while writing out the document. Pieces are encoded and handed to
+    write() in chunks, so the whole PDF never sits in memory as one string
+    (and then again as its encoded bytes).
+    """
+
+    def __init__(self, write: Callable[[bytes], object], chunk_size: int = OUTPUT_CHUNK_SIZE):
+        self._write = write
+        self._chunk_size = chunk_size
+        self._pending = []
+        self._pending_len = 0
+        self._length = 0
+
+    def __iadd__(self, piece: str):
+        self._pending.append(piece)
+        self._pending_len += len(piece)
+        self._length += len(piece)
+        if self._pending_len >= self._chunk_size:
+            self.flush()
+        return self
+
+    def __len__(self):
+        # fpdf's byte offsets: latin-1 maps one character to one byte
+        return self._length
+
+    def flush(self):
+        if self._pending:
+            self._write(''.join(self._pending).encode('latin-1'))
+            self._pending = []
+            self._pending_len = 0
+
 
 class PDF(FPDF):
+    def __init__(self, plan: RenderPlan):
+        super().__init__()
+        self.plan = plan
+        self.set_margins(plan.template.margin, plan.template.margin)
+        self.set_auto_page_break(auto=True, margin=PAGE_BREAK_MARGIN)
+        # Page setup done; everything past this point is per-document state.
+        # fpdf's containers (pages, fonts, offsets, ...) are flat, so shallow copies suffice.
+        self._blank_state = dict(self.__dict__)
+        self._blank_containers = [key for key, value in self._blank_state.items() if isinstance(value, (dict, list))]
+
+    def new_document(self):
+        """Reset to the state right after setup (no pages, fonts or output) and open page one."""
+        state, blank, containers = self.__dict__, self._blank_state, self._blank_containers
+        state.clear()
+        state.update(blank)
+        for key in containers:
+            state[key] = blank[key].copy()
+        self._blank_state, self._blank_containers = blank, containers
+        self.add_page()
+
+    def use_style(self, role):
+        font, style, size, color, ttf_path = self.plan.styles[role]
+        if ttf_path:
+            # Registered on first use so unused variants are never embedded
+            register_font(self, font, style, ttf_path)
+        self.set_font(font, style, size)
+        self.set_text_color(*color)
+
+    def rule(self, color=(0, 0, 0)):
+        self.set_draw_color(*color)
+        self.line(self.l_margin, self.get_y(), self.w - self.r_margin, self.get_y())
+
+    def get_string_width(self, s):
+        key = (self.font_family + self.font_style, s)
+        units = _STRING_WIDTHS.get(key)
+        if units is None:
+            if len(_STRING_WIDTHS) >= _STRING_WIDTHS_MAX:
+                _STRING_WIDTHS.clear()
+            units = _STRING_WIDTHS[key] = super().get_string_width(s) * 1000.0 / self.font_size if self.font_size else 0.0
+        return units * self.font_size / 1000.0
+
+    def normalize_text(self, txt):
+        # Core fonts are latin-1 only; degrade gracefully instead of failing the export
+        if not self.unifontsubset and isinstance(txt, str):
+            return to_latin1(txt)
+        return txt
+
+    def _putTTfontwidths(self, font, maxUni):
+        lines = cached_font_widths(font, maxUni, lambda: self._capture(super(PDF, self)._putTTfontwidths, font, maxUni))
+        for line in lines:
+            self._out(line)
+
+    def _capture(self, fn, *args):
+        """Run an fpdf writer method and return the lines it would have written."""
+        lines = []
+        self._out = lines.append
+        try:
+            fn(*args)
+        finally:
+            del self._out
+        return lines
+
     def header(self):
         # We can add custom headers here if needed, but for resumes, clean is better.
         pass
 
     def footer(self):
+        template = self.plan.template
+        if not template.footer_text:
+            return
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, 'Generated by AI Resume Builder', 0, 0, 'C')
+        self.use_style('footer')
+        self.cell(0, 10, template.footer_text, 0, 0, 'C')
 
     def chapter_title(self, title):
-        self.set_font('Arial', 'B', 12)
-        self.set_fill_color(200, 220, 255)
-        self.cell(0, 6, title, 0, 1, 'L', 1)
-        self.ln(4)
+        template = self.plan.template
+        self.use_style('heading')
+        if template.heading_fill:
+            self.set_fill_color(*template.heading_fill)
+            self.cell(0, template.heading_height, title, 0, 1, 'L', 1)
+        else:
+            self.cell(0, template.heading_height, title, 0, 1, 'L')
+        if template.heading_rule:
+            self.rule(template.accent_color)
+        self.ln(template.heading_gap)
 
     def chapter_body(self, body):
-        self.set_font('Arial', '', 10)
-        self.multi_cell(0, 5, body)
-        self.ln()
+        self.use_style('body')
+        self.multi_cell(0, self.plan.template.line_height, body)
+        self.ln(self.plan.template.section_gap)
+
+
+# --- SECTION RENDERERS ---
+# Each takes (pdf, section value) plus template values bound at compile time.
+
+def _render_header(pdf, contact, template):
+    name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip()
+    if template.name_upper:
+        name = name.upper()
+    details = contact_details(contact, template.contact_separator)
+
+    pdf.use_style('name')
+    pdf.cell(0, 10, name, 0, 1, template.header_align)
+    pdf.use_style('contact')
+    pdf.cell(0, 5, details, 0, 1, template.header_align)
+    pdf.ln(5)
+
+    if template.header_rule:
+        pdf.rule()
+        pdf.ln(5)
+
+
+def _render_paragraph(pdf, text, title):
+    pdf.chapter_title(title)
+    pdf.chapter_body(text)
+
+
+def _render_skills(pdf, skills, title, separator):
+    pdf.chapter_title(title)
+    pdf.chapter_body(separator.join(skills))
+
+
+def _render_entries(pdf, entries, title, template, entry_title, entry_meta):
+    """Experience-like sections: a bold title line, an optional meta line, then the description."""
+    pdf.chapter_title(title)
+    for entry in entries:
+        pdf.use_style('entry_title')
+        pdf.cell(0, template.line_height, entry_title(entry), 0, 1)
+
+        meta = entry_meta(entry) if entry_meta else ''
+        if meta:
+            pdf.use_style('entry_meta')
+            pdf.cell(0, template.line_height, meta, 0, 1)
+
+        if entry.get('description'):
+            pdf.use_style('body')
+            pdf.multi_cell(0, template.line_height, entry['description'])
+        pdf.ln(template.entry_gap)
+
+
+def _render_education(pdf, education, title, template):
+    pdf.chapter_title(title)
+    for edu in education:
+        pdf.use_style('entry_title')
+        pdf.cell(0, template.line_height, f"{edu.get('degree', '')}", 0, 1)
+
+        pdf.use_style('body')
+        pdf.cell(0, template.line_height, education_details(edu), 0, 1)
+        pdf.ln(template.entry_gap)
+
+
+def _render_list(pdf, items, title, template):
+    pdf.chapter_title(title)
+    pdf.use_style('body')
+    for item in items:
+        pdf.cell(0, template.line_height, f"{template.list_bullet}{item}", 0, 1)
+
+
+def _section_renderer(section, template):
+    title = template.title_for(section)
+    if section == 'summary':
+        return partial(_render_paragraph, title=title)
+    if section == 'skills':
+        return partial(_render_skills, title=title, separator=template.skills_separator)
+    if section == 'experience':
+        return partial(_render_entries, title=title, template=template,
+                       entry_title=experience_title, entry_meta=lambda exp: exp.get('duration', ''))
+    if section == 'projects':
+        return partial(_render_entries, title=title, template=template,
+                       entry_title=project_title, entry_meta=None)
+    if section == 'education':
+        return partial(_render_education, title=title, template=template)
+    if section == 'certifications':
+        return partial(_render_list, title=title, template=template)
+    raise ValueError(f"Template {template.name!r} has unknown section {section!r}")
+
+
+def _resolve_style(style: TextStyle):
+    font = resolve_font(style.family, style.style)
+    if font is None:
+        return (CORE_FONTS[style.family], style.style, style.size, style.color, None)
+    family, font_style, path = font
+    return (family, font_style, style.size, style.color, path)
+
+
+def compile_template(template) -> RenderPlan:
+    """
+    Plan for a template name (compiled once per process; every render reuses it)
+    or for an ad-hoc TemplateSpec, such as a fit-engine variant.
+    """
+    if isinstance(template, TemplateSpec):
+        return build_plan(template)
+    return _compile_template(get_template(template).name)
+
+
+@lru_cache(maxsize=None)
+def _compile_template(name: str) -> RenderPlan:
+    return build_plan(TEMPLATES[name])
+
+
+def build_plan(template: TemplateSpec) -> RenderPlan:
+    styles = {role: _resolve_style(getattr(template, f"{role}_style")) for role in STYLE_ROLES}
+    steps = [('contact_info', partial(_render_header, template=template))]
+    steps += [(section, _section_renderer(section, template)) for section in template.section_order]
+    return RenderPlan(template, styles, tuple(steps))
+
+
+def layout(pdf, plan: RenderPlan, data: dict):
+    """Run every step of the plan against pdf, skipping empty sections."""
+    # The header always renders (even empty) so every resume starts the same way
+    for section, render in plan.steps:
+        value = data.get(section)
+        if value or section == 'contact_info':
+            render(pdf, value or {})
+
+
+class _StreamCancelled(Exception):
+    """Raised inside the iter_chunks writer thread once its consumer has gone away."""
+
+
+_END_OF_STREAM = object()
+
 
 class ResumeGenerator:
-    def __init__(self, data):
+    """
+    Renders resumes with one template. The plan and page setup are built once;
+    each render resets the per-document fpdf state, so one instance can render
+    any number of resumes (one at a time: instances are not thread-safe).
+    ResumeGenerator(data, template).generate() still renders a single resume.
+    """
+
+    def __init__(self, data=None, template=DEFAULT_TEMPLATE):
         self.data = data
-        self.pdf = PDF()
-        self.pdf.add_page()
-        self.pdf.set_auto_page_break(auto=True, margin=15)
-
-    def generate(self, filename="resume.pdf"):
-        # --- HEADER (Contact Info) ---
-        contact = self.data.get('contact_info', {})
-        name = f"{contact.get('first_name', '')} {contact.get('last_name', '')}".upper()
-        details = f"{contact.get('email', '')} | {contact.get('phone', '')}"
-        if contact.get('linkedin'):
-            details += f" | {contact.get('linkedin', '')}"
-        if contact.get('location'):
-            details += f" | {contact.get('location', '')}"
-
-        self.pdf.set_font('Arial', 'B', 16)
-        self.pdf.cell(0, 10, name, 0, 1, 'C')
-        
-        self.pdf.set_font('Arial', '', 10)
-        self.pdf.cell(0, 5, details, 0, 1, 'C')
-        self.pdf.ln(5)
-        
-        self.pdf.line(10, self.pdf.get_y(), 200, self.pdf.get_y())
-        self.pdf.ln(5)
-
-        # --- SUMMARY ---
-        summary = self.data.get('summary', '')
-        if summary:
-            self.pdf.chapter_title("PROFESSIONAL SUMMARY")
-            self.pdf.chapter_body(summary)
-
-        # --- SKILLS ---
-        skills = self.data.get('skills', [])
-        if skills:
-            self.pdf.chapter_title("TECHNICAL SKILLS")
-            skills_str = ", ".join(skills)
-            self.pdf.chapter_body(skills_str)
-
-        # --- EXPERIENCE ---
-        experience = self.data.get('experience', [])
-        if experience:
-            self.pdf.chapter_title("PROFESSIONAL EXPERIENCE")
-            for exp in experience:
-                # Title & Company
-                self.pdf.set_font('Arial', 'B', 10)
-                title_line = f"{exp.get('role', '')} | {exp.get('company', '')}"
-                self.pdf.cell(0, 5, title_line, 0, 1)
-                
-                # Duration
-                self.pdf.set_font('Arial', 'I', 9)
-                self.pdf.cell(0, 5, exp.get('duration', ''), 0, 1)
-                
-                # Description
-                self.pdf.set_font('Arial', '', 10)
-                self.pdf.multi_cell(0, 5, exp.get('description', ''))
-                self.pdf.ln(3)
-
-        # --- PROJECTS ---
-        projects = self.data.get('projects', [])
-        if projects:
-            self.pdf.chapter_title("KEY PROJECTS")
-            for proj in projects:
-                self.pdf.set_font('Arial', 'B', 10)
-                title = f"{proj.get('title', '')}"
-                if proj.get('tech'):
-                    title += f" ({proj.get('tech', '')})"
-                self.pdf.cell(0, 5, title, 0, 1)
-                
-                self.pdf.set_font('Arial', '', 10)
-                self.pdf.multi_cell(0, 5, proj.get('description', ''))
-                self.pdf.ln(3)
-
-        # --- EDUCATION ---
-        education = self.data.get('education', [])
-        if education:
-            self.pdf.chapter_title("EDUCATION")
-            for edu in education:
-                self.pdf.set_font('Arial', 'B', 10)
-                self.pdf.cell(0, 5, f"{edu.get('degree', '')}", 0, 1)
-                
-                self.pdf.set_font('Arial', '', 10)
-                school_line = f"{edu.get('school', '')} | {edu.get('year', '')}"
-                if edu.get('grade'):
-                    school_line += f" | {edu.get('grade', '')}"
-                self.pdf.cell(0, 5, school_line, 0, 1)
-                self.pdf.ln(3)
-        
-        # --- CERTIFICATIONS ---
-        certs = self.data.get('certifications', [])
-        if certs:
-            self.pdf.chapter_title("CERTIFICATIONS")
-            for cert in certs:
-                self.pdf.cell(0, 5, f"- {cert}", 0, 1)
-
-        return self.pdf.output(dest='S').encode('latin-1')
+        self.plan = compile_template(template)
+        self.pdf = PDF(self.plan)
+
+    def _stream(self, data, write: Callable[[bytes], object], chunk_size: int) -> int:
+        if data is None:
+            raise ValueError("No resume data to render")
+        self.pdf.new_document()
+        layout(self.pdf, self.plan, data)
+        sink = StreamBuffer(write, chunk_size)
+        self.pdf.buffer = sink
+        self.pdf.close()
+        sink.flush()
+        return len(sink)
+
+    def render(self, data, target=None, chunk_size: int = OUTPUT_CHUNK_SIZE):
+        """Render data: returns PDF bytes, or streams to target (path or file-like) and returns its size."""
+        if target is None:
+            # getvalue() hands over the buffer itself, so the PDF is held only once
+            buf = io.BytesIO()
+            self._stream(data, buf.write, chunk_size)
+            return buf.getvalue()
+        if isinstance(target, (str, os.PathLike)):
+            # Written beside the target and moved into place only once complete,
+            # so a failed render never leaves a truncated PDF behind
+            tmp_path = os.fspath(target) + ".tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    size = self._stream(data, f.write, chunk_size)
+                os.replace(tmp_path, target)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            return size
+        return self._stream(data, target.write, chunk_size)
+
+    def write_to(self, target, chunk_size: int = OUTPUT_CHUNK_SIZE) -> int:
+        """Stream the PDF to a file path or binary file-like object; returns bytes written."""
+        return self.render(self.data, target, chunk_size)
+
+    def iter_chunks(self, chunk_size: int = OUTPUT_CHUNK_SIZE, ahead: int = ITER_CHUNKS_AHEAD) -> Iterator[bytes]:
+        """
+        The PDF as byte chunks, e.g. for a streaming HTTP response. fpdf lays out
+        every page in memory first; the file itself is then written on a helper
+        thread at most `ahead` chunks in front of the consumer, so the output is
+        never held whole. Don't render with this generator until the iterator is
+        exhausted or closed.
+        """
+        chunks = queue.Queue(maxsize=ahead)
+        cancelled = threading.Event()
+
+        def put(item):
+            while not cancelled.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            raise _StreamCancelled()
+
+        def produce():
+            try:
+                self._stream(self.data, put, chunk_size)
+                put(_END_OF_STREAM)
+            except _StreamCancelled:
+                pass
+            except Exception as e:
+                try:
+                    put(e)
+                except _StreamCancelled:
+                    pass
+
+        writer = threading.Thread(target=produce, name="pdf-chunks", daemon=True)
+        writer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is _END_OF_STREAM:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Also reached when the consumer stops early: unblock and wait for the writer
+            cancelled.set()
+            writer.join()
+
+    def generate(self, filename=None):
+        """Write the PDF to filename and return None, or return it as bytes."""
+        if filename:
+            self.write_to(filename)
+            return None
+        return self.render(self.data)
+
+
+# One generator per named template and thread: renders only reset document state
+_generators = threading.local()
+
+
+def get_generator(template=DEFAULT_TEMPLATE) -> ResumeGenerator:
+    """Reusable generator for a template name, or a fresh one for an ad-hoc TemplateSpec."""
+    if isinstance(template, TemplateSpec):
+        return ResumeGenerator(template=template)
+    name = get_template(template).name
+    cache = getattr(_generators, 'by_name', None)
+    if cache is None:
+        cache = _generators.by_name = {}
+    if name not in cache:
+        cache[name] = ResumeGenerator(template=name)
+    return cache[name]
+
+
+# Small but complete resume used to warm render workers: imports fpdf, loads the
+# fonts and exercises every section so the first real export is not the slow one.
+WARMUP_RESUME = {
+    "contact_info": {"first_name": "Warm", "last_name": "Up", "email": "warm@up", "phone": "0"},
+    "summary": "Warm-up render.",
+    "skills": ["Python"],
+    "experience": [{"role": "Role", "company": "Company", "duration": "2024", "description": "- Did things"}],
+    "projects": [{"title": "Project", "tech": "Python", "description": "- Built things"}],
+    "education": [{"degree": "Degree", "school": "School", "year": "2024", "grade": ""}],
+    "certifications": ["Certificate"],
+}
+
+def render_resume(data, template=DEFAULT_TEMPLATE, fit_pages=0, target=None):
+    """
+    Render one resume. Module-level so worker processes can run it.
+    With fit_pages, the fit engine first shrinks/trims it to that many pages.
+    Returns PDF bytes, or streams to target (path or file-like) and returns its size.
+    """
+    if fit_pages:
+        from utils.fit_engine import fit_to_pages
+        fit = fit_to_pages(data, template, fit_pages)
+        data, template = fit.data, fit.template
+    return get_generator(template).render(data, target)
+
+def warm_up():
+    try:
+        # Compiles every template plan too
+        for name in TEMPLATES:
+            render_resume(WARMUP_RESUME, name)
+    except Exception as e:
+        # A failing warm-up must not break the pool; real renders report their own errors
+        print(f"Render worker warm-up failed: {e}")
@@ -0,0 +1,133 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Classic token bucket. reserve() never blocks: it takes the tokens (possibly
+    going into debt) and returns how long the caller must wait before using them,
+    which lets the same bucket serve both threads and coroutines.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float = 1) -> float:
+        # A single request larger than the whole bucket can still go through once it is full
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def refund(self, amount: float = 1):
+        """Give back a reservation that was not used."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets shared by every caller of the engine."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_wait: float = 30.0):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.max_wait = max_wait
+
+    def _reserve(self, tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > self.max_wait:
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+            return -1.0
+        return wait
+
+    def acquire(self, tokens: int) -> bool:
+        """
+        Block until the budget allows the call. Returns False (without waiting)
+        when the queue ahead is longer than max_wait.
+        """
+        wait = self._reserve(tokens)
+        if wait < 0:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, tokens: int) -> bool:
+        wait = self._reserve(tokens)
+        if wait < 0:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after repeated failures so a struggling provider
+    isn't hammered. After reset_timeout one trial call is let through (half-open);
+    its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0,
+                  retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server-provided Retry-After wins when present."""
+    if retry_after is not None:
+        return min(cap, retry_after) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
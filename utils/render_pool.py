@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import streamlit as st
+
+from utils.config import get_setting
+from utils.pdf_generator import render_resume, warm_up
+
+
+class RenderError(Exception):
+    """Base error for PDF rendering failures."""
+
+
+class RenderTimeoutError(RenderError):
+    pass
+
+
+class RenderQueueFullError(RenderError):
+    pass
+
+
+class RenderPool:
+    """
+    Out-of-process PDF rendering. fpdf layout is pure Python, so rendering on the
+    script thread holds the GIL and stalls every other session; worker processes
+    let exports scale with cores instead.
+
+    max_queue bounds how many renders may wait for a worker; beyond that, submit
+    fails fast with RenderQueueFullError rather than piling up. workers=0 renders
+    inline, for environments where spawning processes is not allowed.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 30.0, max_queue: int = 16):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a multi-threaded Streamlit server is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_up,
+                )
+            return self._executor
+
+    def start(self):
+        """
+        Spawn every worker now, in the background, so the first export doesn't wait
+        for process start-up and warm_up. Workers are otherwise started on demand.
+        """
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            # Each no-op occupies a worker, so the pool spawns all of them
+            executor.submit(os.getpid)
+
+    def _reset_executor(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        # Have the replacement workers warm by the next request
+        self.start()
+
+    def submit(self, data: dict, template: str, **options) -> Future:
+        """Queue a render; options are passed to render_resume (e.g. fit_pages)."""
+        return self._submit(render_resume, data, template, **options)
+
+    def _submit(self, fn, *args, **kwargs) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise RenderQueueFullError("PDF export is busy right now. Please try again in a moment.")
+        try:
+            if self.workers <= 0:
+                future = Future()
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def render(self, data: dict, template: str, timeout: Optional[float] = None, **options) -> bytes:
+        """Render and wait for the result, raising a RenderError subclass on failure."""
+        return self.call(render_resume, data, template, timeout=timeout, **options)
+
+    def call(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in a worker and wait for its result, with the same
+        queueing, timeout and RenderError reporting as render(). fn must be a
+        module-level function so it can be sent to the worker process.
+        """
+        executor = self._executor
+        future = self._submit(fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError as e:
+            # A render that already started cannot be interrupted; it finishes in
+            # the background and its slot is released then.
+            future.cancel()
+            self.timed_out += 1
+            raise RenderTimeoutError("PDF export took too long. Please try again.") from e
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed); start a fresh pool for the next request
+            self.failed += 1
+            self._reset_executor(executor or self._executor)
+            raise RenderError("PDF renderer crashed. Please try again.") from e
+        except Exception as e:
+            self.failed += 1
+            raise RenderError(f"PDF export failed: {e}") from e
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+@st.cache_resource(show_spinner=False)
+def get_render_pool() -> RenderPool:
+    """Render workers shared by every session in this process, warming up from the first call."""
+    pool = RenderPool(
+        workers=int(get_setting("PDF_RENDER_WORKERS", min(4, os.cpu_count() or 1))),
+        timeout=float(get_setting("PDF_RENDER_TIMEOUT", 30)),
+        max_queue=int(get_setting("PDF_RENDER_MAX_QUEUE", 16)),
+    )
+    pool.start()
+    return pool
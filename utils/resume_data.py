@@ -1,5 +1,15 @@
 import streamlit as st
 from typing import Dict, Any
+from utils.db import delete_resume, encode_section, get_resume_autosaver, load_resume
+from utils.templates import DEFAULT_TEMPLATE
+
+# Shared by everyone who skips sign-in, so never persisted
+GUEST_EMAIL = "guest@example.com"
+
+# Stored next to the resume sections: where the user was in the builder
+PROGRESS_SECTION = "_progress"
+# Only these pages are worth returning to
+PROGRESS_PAGES = ("builder", "preview")
 
 class ResumeBuilder:
     def __init__(self):
@@ -13,12 +23,18 @@ class ResumeBuilder:
                 "education": [],
                 "certifications": []
             }
-        
+
         if 'user_role' not in st.session_state:
             st.session_state.user_role = ""
-            
+
         if 'selected_template' not in st.session_state:
-            st.session_state.selected_template = "Classic"
+            st.session_state.selected_template = DEFAULT_TEMPLATE
+
+        # Sections touched since the last save, and what was last saved for each
+        if 'resume_dirty' not in st.session_state:
+            st.session_state.resume_dirty = set()
+        if 'resume_saved' not in st.session_state:
+            st.session_state.resume_saved = {}
 
     def set_user_role(self, role: str):
         st.session_state.user_role = role
@@ -26,9 +42,81 @@ class ResumeBuilder:
     def update_section(self, section: str, data: Any):
         if section in st.session_state.resume_data:
             st.session_state.resume_data[section] = data
+            st.session_state.resume_dirty.add(section)
 
     def get_data(self) -> Dict[str, Any]:
         return st.session_state.resume_data
 
     def get_role(self) -> str:
         return st.session_state.user_role
+
+    def attach_user(self, email: str):
+        """Load the user's saved resume, once per session, the first time they are seen."""
+        if not email or email == GUEST_EMAIL or st.session_state.get('resume_owner') == email:
+            return
+        st.session_state.resume_owner = email
+        resume_data = st.session_state.resume_data
+        stored = load_resume(email)
+        progress = stored.pop(PROGRESS_SECTION, None)
+        for section, value in stored.items():
+            # Edits made in this session win over the stored copy
+            if section in resume_data and section not in st.session_state.resume_dirty:
+                resume_data[section] = value
+                st.session_state.resume_saved[section] = encode_section(value)
+        if progress:
+            st.session_state.resume_saved[PROGRESS_SECTION] = encode_section(progress)
+            # Role and template only come back if this session hasn't picked its own yet
+            if not st.session_state.user_role:
+                st.session_state.user_role = progress.get("user_role", "")
+                st.session_state.selected_template = progress.get("selected_template") or DEFAULT_TEMPLATE
+                st.session_state.saved_progress = progress
+
+    def saved_progress(self):
+        """Where the user left off last time, if they haven't moved on since."""
+        return st.session_state.get('saved_progress')
+
+    def resume_progress(self):
+        """Jump back to the page and section the user left off at."""
+        progress = st.session_state.pop('saved_progress', None)
+        if progress:
+            st.session_state.page = progress.get("page", "builder")
+            st.session_state.current_section = progress.get("current_section", 0)
+
+    def _progress(self):
+        page = st.session_state.get('page')
+        if page not in PROGRESS_PAGES:
+            return None
+        return {
+            "page": page,
+            "current_section": st.session_state.get('current_section', 0),
+            "user_role": st.session_state.user_role,
+            "selected_template": st.session_state.selected_template,
+        }
+
+    def save(self):
+        """Queue sections, and the builder position, that changed since the last save for the autosaver."""
+        dirty = st.session_state.resume_dirty
+        owner = st.session_state.get('resume_owner')
+        if not owner:
+            return
+        saved = st.session_state.resume_saved
+        changed = {}
+        # Entry lists are edited in place, so compare encoded snapshots rather than objects
+        for section in dirty:
+            data = encode_section(st.session_state.resume_data[section])
+            if saved.get(section) != data:
+                changed[section] = saved[section] = data
+        dirty.clear()
+        progress = self._progress()
+        if progress:
+            data = encode_section(progress)
+            if saved.get(PROGRESS_SECTION) != data:
+                changed[PROGRESS_SECTION] = saved[PROGRESS_SECTION] = data
+        if changed:
+            get_resume_autosaver().schedule(owner, changed)
+
+    def discard_saved(self):
+        """Forget the stored resume, e.g. when the user starts over."""
+        owner = st.session_state.get('resume_owner')
+        if owner:
+            delete_resume(owner)
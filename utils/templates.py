@@ -0,0 +1,165 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+# Declarative resume templates. A template is pure data (section order, fonts,
+# spacing, colours); renderers (PDF, HTML preview) compile it into their own
+# output. Adding a template means adding a TemplateSpec here, not layout code.
+
+RGB = Tuple[int, int, int]
+
+SECTION_ORDER = ("summary", "skills", "experience", "projects", "education", "certifications")
+
+SECTION_TITLES = {
+    "summary": "Professional Summary",
+    "skills": "Technical Skills",
+    "experience": "Professional Experience",
+    "projects": "Key Projects",
+    "education": "Education",
+    "certifications": "Certifications",
+}
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    # Logical family: "sans", "serif" or "mono"; each renderer maps it to real fonts
+    family: str = "sans"
+    style: str = ""  # fpdf style letters: "", "B", "I", "BI"
+    size: float = 10
+    color: RGB = (0, 0, 0)
+
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    name: str
+    section_order: Tuple[str, ...] = SECTION_ORDER
+    section_titles: Dict[str, str] = field(default_factory=lambda: dict(SECTION_TITLES))
+    heading_case: str = "upper"  # "upper" or "title"
+
+    # Header (name + contact line)
+    name_style: TextStyle = TextStyle(style="B", size=16)
+    contact_style: TextStyle = TextStyle(size=10)
+    header_align: str = "C"  # fpdf alignment: "L", "C" or "R"
+    name_upper: bool = True
+    contact_separator: str = " | "
+    header_rule: bool = True
+
+    # Section headings
+    heading_style: TextStyle = TextStyle(style="B", size=12)
+    heading_fill: Optional[RGB] = (200, 220, 255)
+    heading_rule: bool = False
+    accent_color: RGB = (0, 0, 0)
+
+    # Body and entries
+    body_style: TextStyle = TextStyle(size=10)
+    entry_title_style: TextStyle = TextStyle(style="B", size=10)
+    entry_meta_style: TextStyle = TextStyle(style="I", size=9)
+    skills_separator: str = ", "
+    list_bullet: str = "- "
+
+    # Spacing, in mm
+    margin: float = 10
+    line_height: float = 5
+    heading_height: float = 6
+    heading_gap: float = 4
+    entry_gap: float = 3
+    section_gap: float = 5
+
+    footer_text: str = "Generated by AI Resume Builder"
+    footer_style: TextStyle = TextStyle(style="I", size=8)
+
+    def title_for(self, section: str) -> str:
+        title = self.section_titles.get(section, section.title())
+        return title.upper() if self.heading_case == "upper" else title
+
+
+TEMPLATES = {
+    "Classic Professional": TemplateSpec(name="Classic Professional"),
+    "Modern Clean": TemplateSpec(
+        name="Modern Clean",
+        section_order=("summary", "experience", "projects", "skills", "education", "certifications"),
+        heading_case="title",
+        name_style=TextStyle(style="B", size=22, color=(33, 37, 41)),
+        contact_style=TextStyle(size=9, color=(90, 98, 107)),
+        header_align="L",
+        name_upper=False,
+        contact_separator="  ·  ",
+        header_rule=False,
+        heading_style=TextStyle(style="B", size=13, color=(0, 102, 153)),
+        heading_fill=None,
+        heading_rule=True,
+        accent_color=(0, 102, 153),
+        body_style=TextStyle(size=10, color=(33, 37, 41)),
+        entry_title_style=TextStyle(style="B", size=10.5, color=(33, 37, 41)),
+        entry_meta_style=TextStyle(size=9, color=(90, 98, 107)),
+        skills_separator="  ·  ",
+        list_bullet="• ",
+        margin=15,
+        heading_gap=3,
+        section_gap=4,
+    ),
+    "Tech Minimalist": TemplateSpec(
+        name="Tech Minimalist",
+        section_order=("skills", "experience", "projects", "summary", "education", "certifications"),
+        section_titles=dict(SECTION_TITLES, skills="Stack", projects="Projects"),
+        heading_case="upper",
+        name_style=TextStyle(family="mono", style="B", size=18),
+        contact_style=TextStyle(family="mono", size=8.5, color=(80, 80, 80)),
+        header_align="L",
+        name_upper=False,
+        contact_separator=" / ",
+        header_rule=True,
+        heading_style=TextStyle(family="mono", style="B", size=11),
+        heading_fill=None,
+        heading_rule=False,
+        body_style=TextStyle(size=9.5),
+        entry_title_style=TextStyle(family="mono", style="B", size=10),
+        entry_meta_style=TextStyle(family="mono", size=8.5, color=(80, 80, 80)),
+        skills_separator=" / ",
+        list_bullet="> ",
+        margin=12,
+        line_height=4.6,
+        heading_height=5,
+        heading_gap=2,
+        entry_gap=2.5,
+        section_gap=4,
+        footer_text="",
+    ),
+}
+
+# --- ENTRY TEXT ---
+# How entries read is the same in every renderer; only styling differs.
+
+def experience_title(exp: dict) -> str:
+    return f"{exp.get('role', '')} | {exp.get('company', '')}"
+
+
+def project_title(proj: dict) -> str:
+    title = f"{proj.get('title', '')}"
+    if proj.get('tech'):
+        title += f" ({proj.get('tech', '')})"
+    return title
+
+
+def education_details(edu: dict) -> str:
+    details = f"{edu.get('school', '')} | {edu.get('year', '')}"
+    if edu.get('grade'):
+        details += f" | {edu.get('grade', '')}"
+    return details
+
+
+def contact_details(contact: dict, separator: str) -> str:
+    return separator.join(
+        contact[field] for field in ('email', 'phone', 'linkedin', 'location') if contact.get(field)
+    )
+
+
+# Older sessions store the short name ResumeBuilder used to default to
+TEMPLATE_ALIASES = {"Classic": "Classic Professional"}
+
+DEFAULT_TEMPLATE = "Classic Professional"
+
+
+def get_template(name: Optional[str]) -> TemplateSpec:
+    """Look up a template by name; unknown names fall back to the default."""
+    name = TEMPLATE_ALIASES.get(name, name)
+    return TEMPLATES.get(name) or TEMPLATES[DEFAULT_TEMPLATE]
@@ -0,0 +1,55 @@
+import math
+
+# Llama-family tokenizers average roughly 4 characters per token on English prose.
+# Good enough for budgeting; exact counts come back in the provider's usage block.
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_messages_tokens(messages: list) -> int:
+    # ~4 tokens of chat-format overhead per message
+    return sum(estimate_tokens(m.get("content", "")) + 4 for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shrink text to roughly max_tokens, keeping the beginning and the end
+    (where context and the actual question usually are) and dropping the middle.
+    """
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    if budget <= 0:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    head = budget * 2 // 3
+    tail = budget - head
+    return text[:head].rstrip() + TRUNCATION_MARKER + text[len(text) - tail:].lstrip()
+
+
+def trim_messages(messages: list, max_tokens: int) -> list:
+    """
+    Keep the newest messages that fit in max_tokens. A leading system message
+    (e.g. a conversation summary) is kept in preference to older turns.
+    """
+    pinned = []
+    if messages and messages[0].get("role") == "system":
+        pinned, messages = [messages[0]], messages[1:]
+        if estimate_messages_tokens(pinned) > max_tokens:
+            pinned = []
+    budget = max_tokens - estimate_messages_tokens(pinned)
+    kept = []
+    for message in reversed(messages):
+        cost = estimate_messages_tokens([message])
+        if cost > budget:
+            break
+        kept.append(message)
+        budget -= cost
+    return pinned + kept[::-1]